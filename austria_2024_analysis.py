@@ -7,7 +7,6 @@
 
 import matplotlib.pyplot as plt
 import numpy as np
-import json
 
 # 设置字体和样式
 plt.rcParams['font.sans-serif'] = ['Arial', 'DejaVu Sans']
@@ -255,8 +254,8 @@ class Austria2024Analyzer:
                            label='Race Position', alpha=0.7, color='lightcoral')
             
             # 绘制积分（线图）
-            line = ax4_twin.plot(x_pos, points, 'o-', color='gold', linewidth=3, 
-                               markersize=8, label='Points')
+            ax4_twin.plot(x_pos, points, 'o-', color='gold', linewidth=3, 
+                          markersize=8, label='Points')
             
             ax4.set_xlabel('Drivers')
             ax4.set_ylabel('Position (Higher = Better)')
@@ -378,7 +377,7 @@ Key Insights:
         mc_data = team_stats.get('McLaren', {})
         
         if rb_data and mc_data:
-            print(f"\n🏆 TEAM BATTLE: Red Bull Racing vs McLaren")
+            print("\n🏆 TEAM BATTLE: Red Bull Racing vs McLaren")
             print(f"Red Bull Racing: {int(rb_data['total_points'])} points | Best: P{int(rb_data['best_position'])}")
             print(f"McLaren:        {int(mc_data['total_points'])} points | Best: P{int(mc_data['best_position'])}")
             
@@ -386,7 +385,7 @@ Key Insights:
             margin = abs(rb_data['total_points'] - mc_data['total_points'])
             print(f"\n🎯 WINNER: {winner} (+{int(margin)} points)")
             
-            print(f"\n👨‍🏎️ DRIVER PERFORMANCES:")
+            print("\n👨‍🏎️ DRIVER PERFORMANCES:")
             print("Red Bull Racing:")
             for i, driver in enumerate(rb_data['drivers']):
                 pos = int(rb_data['positions'][i])
@@ -403,13 +402,13 @@ Key Insights:
                 change = int(mc_data['positions'][i] - mc_data['grid_positions'][i])
                 print(f"  • {driver}: P{pos} ({pts} pts) | Grid: P{grid} | Change: {change:+d}")
             
-            print(f"\n📊 KEY INSIGHTS:")
-            print(f"• Verstappen started P1 but finished P5 (-4 positions)")
-            print(f"• Norris had a difficult race: P2 grid → P20 finish")
-            print(f"• Piastri delivered strong points: P7 grid → P2 finish (+5)")
-            print(f"• Perez maintained position: P8 grid → P7 finish")
-            print(f"• McLaren showed pace but reliability/strategy issues affected Norris")
-            print(f"• Red Bull Racing secured more points despite Verstappen's struggles")
+            print("\n📊 KEY INSIGHTS:")
+            print("• Verstappen started P1 but finished P5 (-4 positions)")
+            print("• Norris had a difficult race: P2 grid → P20 finish")
+            print("• Piastri delivered strong points: P7 grid → P2 finish (+5)")
+            print("• Perez maintained position: P8 grid → P7 finish")
+            print("• McLaren showed pace but reliability/strategy issues affected Norris")
+            print("• Red Bull Racing secured more points despite Verstappen's struggles")
 
 def main():
     """主函数"""
@@ -7,11 +7,8 @@ F1赛车性能对比分析工具
 """
 
 import fastf1
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
-from matplotlib.patches import Rectangle
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -391,7 +388,7 @@ class F1PerformanceComparison:
             plt.show()
             
             # 打印圈速信息
-            print(f"\n🏁 圈速对比:")
+            print("\n🏁 圈速对比:")
             print(f"{driver1} ({team1}): {lap1['LapTime']}")
             print(f"{driver2} ({team2}): {lap2['LapTime']}")
             
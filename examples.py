@@ -6,8 +6,6 @@ FastF1 MCP Server Usage Examples
 
 import json
 import asyncio
-import sys
-from datetime import datetime
 
 class FastF1MCPClient:
     """简单的MCP客户端示例"""
@@ -1,7 +1,7 @@
 import asyncio
 import json
 import sys
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List
 import requests
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
@@ -340,7 +340,7 @@ class F1SeasonAnalysisOptimized:
         
         # 整体统计
         all_changes = [race['position_change'] for race in self.season_data]
-        print(f"\n📊 整体统计:")
+        print("\n📊 整体统计:")
         print(f"• 总比赛记录: {len(self.season_data)}条")
         print(f"• 参赛车手数: {len(self.driver_stats)}位")
         print(f"• 平均位置变化: {np.mean(all_changes):.2f}位")
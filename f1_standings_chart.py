@@ -5,10 +5,7 @@ F1 2025赛季车手积分排名图表生成器
 """
 
 import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 import numpy as np
-from matplotlib import font_manager
-import seaborn as sns
 
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
@@ -6,9 +6,7 @@ F1赛车发车名次 vs 最终完赛名次对比图 - 支持任意年份和赛
 """
 
 import matplotlib.pyplot as plt
-import numpy as np
 import pandas as pd
-from matplotlib import font_manager
 import seaborn as sns
 import fastf1
 import argparse
@@ -284,7 +282,7 @@ class F1GridVsFinishAnalysis:
         print("\n💡 关键洞察:")
         print(f"• 共有{len(self.df[self.df['points'] > 0])}位车手获得积分")
         print(f"• 平均位置变化: {self.df['position_change'].mean():.1f}位")
-        print(f"• 最激烈的位置争夺发生在中游集团")
+        print("• 最激烈的位置争夺发生在中游集团")
         
         if not retired_drivers.empty:
             print(f"• {len(retired_drivers)}位车手未能完赛")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+FastF1 MCP Server 命令行入口
+只处理命令行参数，真正启动服务器时才导入服务器模块及FastF1、pandas等依赖
+"""
+
+import sys
+
+def _version():
+    """
+    读取版本号，不导入服务器模块
+    
+    已安装时读取包元数据；从源码目录直接运行时解析服务器模块中的 __version__
+    """
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version("fastf1-mcp-server")
+    except PackageNotFoundError:
+        import ast
+        from pathlib import Path
+        
+        tree = ast.parse(Path(__file__).with_name("fastf1_mcp_server.py").read_bytes())
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and any(
+                    isinstance(t, ast.Name) and t.id == "__version__" for t in node.targets):
+                return ast.literal_eval(node.value)
+        return "unknown"
+
+def main(argv=None):
+    """命令行主函数"""
+    args = sys.argv[1:] if argv is None else argv
+    if "--version" in args:
+        print(_version())
+        return
+    
+    from fastf1_mcp_server import main as run_server
+    run_server()
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,24 @@ FastF1 MCP Server - Comprehensive F1 Data Server
 基于FastF1库的MCP服务器，提供完整的F1数据访问功能
 """
 
+__version__ = "2.0.0"
+
 import asyncio
+import base64
 import json
 import sys
 import os
+import tempfile
 import logging
-from typing import Any, Dict, List, Optional, Union
-from datetime import datetime
+import threading
+import functools
+import weakref
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+from datetime import date, datetime, time
 import pandas as pd
+import numpy as np
 
 # FastF1 imports
 try:
@@ -20,16 +30,162 @@ try:
     from fastf1.ergast import Ergast
     import fastf1.core
     import fastf1.utils
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     # Session and Event are available through get_session and get_event_schedule
 except ImportError as e:
     print(f"FastF1 not installed or import failed: {e}", file=sys.stderr)
     print("Please install with: pip install fastf1 pandas numpy matplotlib scipy tqdm requests urllib3", file=sys.stderr)
     sys.exit(1)
 
+# 可选依赖：圈速记录索引和历史结果的Arrow编码使用pyarrow
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pc = None
+    pq = None
+
+# 可选依赖：更快的JSON编解码
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 同时进行的会话加载数量上限
+MAX_CONCURRENT_LOADS = 8
+
+# 内存中缓存的已加载会话数量上限
+SESSION_CACHE_SIZE = 32
+
+# FastF1/Ergast请求共用的HTTP连接池大小
+HTTP_POOL_CONNECTIONS = 16
+HTTP_POOL_MAXSIZE = 32
+
+# 圈速记录索引中每个赛道的有效期（秒），过期后重新查询Ergast以纳入新赛季
+LAP_RECORDS_TTL = 24 * 3600
+
+def _json_default(obj: Any) -> Any:
+    """序列化JSON无法直接处理的pandas/NumPy对象"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()  # 与orjson对datetime的原生输出一致，包括pd.Timestamp
+    return str(obj)
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """解析JSON-RPC请求"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj: Any) -> str:
+    """序列化JSON-RPC响应"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default).decode()
+    return json.dumps(obj, ensure_ascii=False, default=_json_default)
+
+def _json_text(obj: Any) -> str:
+    """
+    序列化工具和资源返回的文本内容（缩进2格）
+    
+    orjson直接在C中处理NumPy数组/标量和datetime，只有pandas类型才回调 _json_default。
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option, default=_json_default).decode()
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=_json_default)
+
+def _frame_columns(df: pd.DataFrame) -> Dict[str, Any]:
+    """把DataFrame转换为列名加二维数据的列式结构，时间差列转换为秒"""
+    timedelta_columns = df.select_dtypes('timedelta64').columns
+    if len(timedelta_columns):
+        df = df.assign(**{c: df[c].dt.total_seconds() for c in timedelta_columns})
+    return {
+        "columns": df.columns.tolist(),
+        "data": df.to_numpy().tolist()
+    }
+
+@functools.lru_cache(maxsize=16)
+def _season_drivers(year: int) -> Tuple[Mapping[str, Any], ...]:
+    """
+    获取赛季第一场比赛的车手列表，按年份缓存
+    
+    缓存的车手信息是只读映射，查询函数返回时复制为普通字典，调用方修改不会污染缓存。
+    """
+    session_obj = get_session(year, 1, 'R')  # 使用第一场比赛
+    session_obj.load(laps=False, telemetry=False, weather=False, messages=False)
+    return tuple(MappingProxyType(session_obj.get_driver(d).to_dict()) for d in session_obj.drivers)
+
+@functools.lru_cache(maxsize=16)
+def _season_round_drivers(ergast: Ergast, year: int) -> Dict[int, frozenset]:
+    """
+    按轮次索引赛季正赛的参赛车手代码：{round: frozenset(driverCode)}
+    
+    整个赛季的正赛结果分页取回，每页的描述表和结果表按顺序一一对应。
+    """
+    index: Dict[int, set] = {}
+    page = ergast.get_race_results(season=year, limit=100)
+    while True:
+        for round_number, results in zip(page.description['round'], page.content):
+            index.setdefault(int(round_number), set()).update(results['driverCode'].dropna())
+        if page.is_complete:
+            break
+        try:
+            page = page.get_next_result_page()
+        except ValueError:
+            break
+    
+    return {round_number: frozenset(codes) for round_number, codes in index.items()}
+
+def _circuit_fastest_laps(ergast: Ergast, circuit: str) -> List[Dict[str, Any]]:
+    """
+    从Ergast取回赛道历年正赛的最快圈：[{Year, Session, LapTime}]，LapTime 以秒为单位
+    
+    Ergast只提供正赛最快圈（2004年起），按 fastest_rank=1 过滤后每场比赛一行，分页取回。
+    """
+    records = []
+    page = ergast.get_race_results(circuit=circuit, fastest_rank=1, limit=100)
+    while True:
+        for season, results in zip(page.description['season'], page.content):
+            lap_times = results['fastestLapTime'].dropna()
+            if len(lap_times):
+                records.append({
+                    "Year": int(season),
+                    "Session": "R",
+                    "LapTime": lap_times.min().total_seconds()
+                })
+        if page.is_complete:
+            break
+        try:
+            page = page.get_next_result_page()
+        except ValueError:
+            break
+    
+    records.sort(key=lambda r: (r["Year"], r["Session"]))
+    return records
+
+def _lookup_driver(year: int, driver: str) -> Dict[str, Any]:
+    """按车手缩写、全名或车号查询车手信息"""
+    for d in _season_drivers(year):
+        if driver in [d['Abbreviation'], d['FullName'], str(d['DriverNumber'])]:
+            return dict(d)
+    
+    raise Exception(f"Driver {driver} not found")
+
+def _lookup_team(year: int, team: str) -> List[Dict[str, Any]]:
+    """查询车队名称中包含 team 的所有车手"""
+    team = team.lower()
+    return [dict(d) for d in _season_drivers(year) if team in d['TeamName'].lower()]
+
 class FastF1MCPServer:
     """
     基于FastF1的MCP服务器，提供全面的F1数据访问功能
@@ -37,14 +193,25 @@ class FastF1MCPServer:
     
     def __init__(self):
         self.name = "fastf1-mcp-server"
-        self.version = "2.0.0"
+        self.version = __version__
         self.ergast = Ergast()
         self.cache_enabled = True
         self.cache_dir = None
+        self.cache_prefetch = False
+        self.lap_records = None
+        self._lap_records_mtime = None
+        self._lap_records_lock = threading.Lock()
+        self._load_semaphore = None
+        self._session_cache = OrderedDict()
+        self._driver_lap_index = weakref.WeakKeyDictionary()
+        self._lap_time_ms = weakref.WeakKeyDictionary()
         
         # 初始化FastF1缓存
         self._setup_cache()
         
+        # 加载磁盘上的圈速记录索引
+        self._load_lap_records_index()
+        
     def _setup_cache(self):
         """设置FastF1缓存"""
         try:
@@ -53,6 +220,130 @@ class FastF1MCPServer:
                 logger.info("FastF1 cache enabled")
         except Exception as e:
             logger.warning(f"Failed to setup cache: {e}")
+        
+        self._mount_http_pool()
+    
+    def _mount_http_pool(self):
+        """
+        为FastF1的HTTP会话挂载连接池
+        
+        Ergast和会话数据请求都经由 fastf1.req.Cache 的会话发出，保持长连接后后续请求不再重复TCP/TLS握手。
+        启用缓存时FastF1会重建带缓存的会话，因此每次启用缓存后都需要重新挂载。
+        """
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504))
+        )
+        for http_session in (fastf1.req.Cache._requests_session, fastf1.req.Cache._requests_session_cached):
+            if http_session is not None:
+                http_session.mount('https://', adapter)
+                http_session.mount('http://', adapter)
+    
+    def _lap_records_path(self) -> str:
+        """圈速记录索引文件路径"""
+        return os.path.join(self.cache_dir or './f1_cache', 'lap_records.parquet')
+    
+    def _load_lap_records_index(self) -> bool:
+        """
+        以内存映射方式加载圈速记录索引
+        
+        索引为parquet文件，每行是一条 (Circuit, Year, Session, LapTime, FetchedAt) 记录，LapTime 以秒为单位，
+        FetchedAt 为该赛道从Ergast取回时的Unix时间戳，由 _save_lap_records 在查询Ergast后写入。
+        文件未变化时不会重复读取。
+        """
+        if pq is None:
+            return False
+        
+        with self._lap_records_lock:
+            return self._read_lap_records_index()
+    
+    def _read_lap_records_index(self) -> bool:
+        """读取圈速记录索引文件，调用方需持有 _lap_records_lock"""
+        path = self._lap_records_path()
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return False
+        
+        if mtime == self._lap_records_mtime:
+            return False
+        
+        try:
+            self.lap_records = pq.read_table(path, memory_map=True)
+            self._lap_records_mtime = mtime
+            logger.info(f"Loaded lap records index: {self.lap_records.num_rows} rows")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to load lap records index: {e}")
+            return False
+    
+    def _save_lap_records(self, circuit: str, records: List[Dict[str, Any]]):
+        """
+        把从Ergast取回的赛道记录并入圈速记录索引，之后同一赛道的查询直接走索引
+        
+        读取-合并-写入在锁内完成，并发保存不同赛道时不会互相覆盖。先写同目录下的唯一临时文件再原子替换，
+        正在内存映射读取旧文件的查询不受影响。
+        """
+        schema = pa.schema([('Circuit', pa.string()), ('Year', pa.int64()),
+                            ('Session', pa.string()), ('LapTime', pa.float64()),
+                            ('FetchedAt', pa.float64())])
+        fetched_at = datetime.now().timestamp()
+        new = pa.Table.from_pylist([{"Circuit": circuit, **r, "FetchedAt": fetched_at} for r in records],
+                                   schema=schema)
+        
+        path = self._lap_records_path()
+        directory = os.path.dirname(path)
+        with self._lap_records_lock:
+            tmp_path = None
+            try:
+                # 其他进程可能已更新索引文件，合并前先读入最新内容
+                self._read_lap_records_index()
+                if self.lap_records is not None:
+                    old = self.lap_records
+                    if 'FetchedAt' not in old.column_names:
+                        # 旧版本索引没有取回时间，视为已过期
+                        old = old.append_column('FetchedAt', pa.array([0.0] * old.num_rows, pa.float64()))
+                    old = old.select(schema.names).cast(schema)
+                    old = old.filter(pc.invert(pc.equal(old['Circuit'], circuit)))
+                    new = pa.concat_tables([old, new])
+                
+                os.makedirs(directory, exist_ok=True)
+                with tempfile.NamedTemporaryFile(dir=directory, prefix='lap_records.', suffix='.tmp',
+                                                 delete=False) as tmp:
+                    tmp_path = tmp.name
+                pq.write_table(new, tmp_path)
+                os.replace(tmp_path, path)
+                tmp_path = None
+                self.lap_records = new
+                self._lap_records_mtime = os.path.getmtime(path)
+            except Exception as e:
+                logger.warning(f"Failed to save lap records index: {e}")
+            finally:
+                if tmp_path is not None and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+    
+    def _clear_lap_records_index(self, delete: bool = False):
+        """
+        丢弃内存中的圈速记录索引，delete 为真时同时删除磁盘上的索引文件
+        
+        fastf1.Cache.clear_cache 只删除 *.ff1pkl 文件，清空缓存时需要单独删除索引。
+        """
+        with self._lap_records_lock:
+            if delete:
+                try:
+                    os.remove(self._lap_records_path())
+                except FileNotFoundError:
+                    pass
+            self.lap_records = None
+            self._lap_records_mtime = None
+    
+    async def refresh_lap_records_index(self, interval: float = 300.0):
+        """后台定期检查并重新加载圈速记录索引"""
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(interval)
+            await loop.run_in_executor(None, self._load_lap_records_index)
     
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """处理MCP请求的主入口点"""
@@ -355,6 +646,11 @@ class FastF1MCPServer:
                         "gp": {
                             "type": "string",
                             "description": "大奖赛名称或号码 (可选)"
+                        },
+                        "format": {
+                            "type": "string",
+                            "enum": ["json", "arrow"],
+                            "description": "结果编码：json为列名加二维数据（时间差为秒），arrow为base64编码的Arrow IPC流，供能解码Arrow的客户端使用 (默认json)"
                         }
                     },
                     "required": ["year"]
@@ -362,13 +658,13 @@ class FastF1MCPServer:
             },
             {
                 "name": "get_lap_records",
-                "description": "获取赛道圈速记录",
+                "description": "获取赛道历年最快圈记录，每条为 {Year, Session, LapTime(秒)}",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
                         "circuit": {
                             "type": "string",
-                            "description": "赛道名称"
+                            "description": "Ergast赛道ID，如 red_bull_ring、monza"
                         }
                     },
                     "required": ["circuit"]
@@ -443,6 +739,10 @@ class FastF1MCPServer:
                         "clear_cache": {
                             "type": "boolean",
                             "description": "是否清除现有缓存"
+                        },
+                        "prefetch": {
+                            "type": "boolean",
+                            "description": "加载会话前是否批量预读该会话的缓存文件"
                         }
                     }
                 }
@@ -504,7 +804,7 @@ class FastF1MCPServer:
             elif tool_name == "configure_cache":
                 result = await self._configure_cache(arguments)
             elif tool_name == "get_cache_info":
-                result = await self._get_cache_info()
+                result = self._get_cache_info()
             else:
                 return self._error_response(request_id, -32602, f"Unknown tool: {tool_name}")
             
@@ -515,7 +815,7 @@ class FastF1MCPServer:
                     "content": [
                         {
                             "type": "text",
-                            "text": json.dumps(result, ensure_ascii=False, indent=2, default=str)
+                            "text": _json_text(result)
                         }
                     ]
                 }
@@ -563,15 +863,15 @@ class FastF1MCPServer:
             if uri == "f1://schedule/current":
                 current_year = datetime.now().year
                 schedule = await self._get_event_schedule({"year": current_year})
-                content = json.dumps(schedule, ensure_ascii=False, indent=2, default=str)
+                content = _json_text(schedule)
             elif uri == "f1://standings/drivers":
                 current_year = datetime.now().year
                 standings = await self._get_driver_standings({"year": current_year})
-                content = json.dumps(standings, ensure_ascii=False, indent=2, default=str)
+                content = _json_text(standings)
             elif uri == "f1://standings/constructors":
                 current_year = datetime.now().year
                 standings = await self._get_constructor_standings({"year": current_year})
-                content = json.dumps(standings, ensure_ascii=False, indent=2, default=str)
+                content = _json_text(standings)
             else:
                 return self._error_response(request_id, -32602, f"Unknown resource: {uri}")
             
@@ -602,6 +902,141 @@ class FastF1MCPServer:
             }
         }
     
+    def _get_load_semaphore(self) -> asyncio.Semaphore:
+        """限制同时进行的会话加载数量，避免压垮FastF1/Ergast后端"""
+        if self._load_semaphore is None:
+            self._load_semaphore = asyncio.Semaphore(MAX_CONCURRENT_LOADS)
+        return self._load_semaphore
+    
+    async def _load_session(self, year: int, gp: Union[str, int], session: str, *,
+                            laps: bool = True, telemetry: bool = True,
+                            weather: bool = True, messages: bool = True):
+        """
+        加载会话并缓存，并发调用者共享同一个加载任务
+        
+        缓存按 (year, gp, session) 存储加载选项和任务。已缓存的会话包含所需数据时直接复用，
+        否则按合并后的加载选项重新加载并替换缓存项。
+        """
+        key = (year, str(gp), session)
+        mask = (laps, telemetry, weather, messages)
+        
+        entry = self._session_cache.get(key)
+        if entry is not None:
+            cached_mask, task = entry
+            if all(cached or not needed for cached, needed in zip(cached_mask, mask)):
+                self._session_cache.move_to_end(key)
+                return await task
+            mask = tuple(cached or needed for cached, needed in zip(cached_mask, mask))
+        
+        task = asyncio.ensure_future(self._run_session_load(year, gp, session, mask))
+        task.add_done_callback(functools.partial(self._evict_failed_session, key))
+        self._session_cache[key] = (mask, task)
+        self._session_cache.move_to_end(key)
+        while len(self._session_cache) > SESSION_CACHE_SIZE:
+            self._session_cache.popitem(last=False)
+        
+        return await task
+    
+    async def _run_session_load(self, year: int, gp: Union[str, int], session: str,
+                                mask: Tuple[bool, bool, bool, bool]):
+        """在线程池中执行会话加载"""
+        laps, telemetry, weather, messages = mask
+        
+        def load():
+            session_obj = get_session(year, gp, session)
+            if self.cache_prefetch and self.cache_enabled:
+                self._prefetch_session_cache(session_obj)
+            session_obj.load(laps=laps, telemetry=telemetry, weather=weather, messages=messages)
+            return session_obj
+        
+        async with self._get_load_semaphore():
+            return await asyncio.get_event_loop().run_in_executor(None, load)
+    
+    def _prefetch_session_cache(self, session_obj):
+        """
+        预读会话的缓存文件
+        
+        对会话缓存目录下的所有文件一次性发出 POSIX_FADV_WILLNEED，由内核在后台并行读入页缓存，
+        之后 FastF1 逐个反序列化时不必再串行等待磁盘。不支持 posix_fadvise 的平台直接跳过。
+        """
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        cache_root = fastf1.Cache._CACHE_DIR
+        api_path = getattr(session_obj, 'api_path', None)
+        if not cache_root or not api_path:
+            return
+        
+        # FastF1 按 api_path 去掉开头的 '/static/' 组织会话缓存目录
+        session_dir = os.path.join(cache_root, api_path[8:])
+        try:
+            entries = list(os.scandir(session_dir))
+        except OSError:
+            return
+        
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            try:
+                fd = os.open(entry.path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+    
+    def _evict_failed_session(self, key: Tuple[Any, ...], task: asyncio.Future):
+        """加载失败的会话不保留在缓存中"""
+        if not task.cancelled() and task.exception() is None:
+            return
+        entry = self._session_cache.get(key)
+        if entry is not None and entry[1] is task:
+            del self._session_cache[key]
+    
+    def _clear_session_caches(self):
+        """
+        清空内存中的会话和车手数据缓存
+        
+        清空或切换FastF1磁盘缓存后，内存中已加载的会话仍会返回旧数据，需要一并丢弃。
+        """
+        self._session_cache.clear()
+        self._driver_lap_index.clear()
+        self._lap_time_ms.clear()
+        _season_drivers.cache_clear()
+        _season_round_drivers.cache_clear()
+    
+    def _driver_laps(self, session_obj, driver: str) -> pd.DataFrame:
+        """
+        取出某位车手的圈速
+        
+        每个会话只做一次按车手分组，得到各车手的行号，之后不同车手的查询直接按行号取数据。
+        """
+        index = self._driver_lap_index.get(session_obj)
+        if index is None:
+            index = session_obj.laps.groupby('Driver', sort=False).indices
+            self._driver_lap_index[session_obj] = index
+        
+        return session_obj.laps.iloc[index.get(driver, [])]
+    
+    def _driver_lap_times_ms(self, session_obj, driver: str) -> np.ndarray:
+        """
+        取出某位车手的圈速（float32毫秒，无效圈为NaN）
+        
+        每个会话只把 timedelta64[ns] 转换一次并缓存，归约时读取的字节数是原来的一半。
+        """
+        lap_ms = self._lap_time_ms.get(session_obj)
+        if lap_ms is None:
+            lap_time = session_obj.laps['LapTime'].to_numpy()
+            lap_ms = (lap_time.view(np.int64) / 1e6).astype(np.float32)
+            lap_ms[np.isnat(lap_time)] = np.nan
+            self._lap_time_ms[session_obj] = lap_ms
+        
+        # _driver_laps 会先建立并缓存该会话的车手行号
+        self._driver_laps(session_obj, driver)
+        return lap_ms[self._driver_lap_index[session_obj].get(driver, [])]
+    
     # 工具实现方法
     async def _get_event_schedule(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """获取赛事日程"""
@@ -625,8 +1060,8 @@ class FastF1MCPServer:
         session = params["session"]
         
         try:
-            session_obj = get_session(year, gp, session)
-            session_obj.load()
+            session_obj = await self._load_session(year, gp, session, laps=False, telemetry=False,
+                                                   weather=False, messages=False)
             
             return {
                 "session_info": {
@@ -649,8 +1084,8 @@ class FastF1MCPServer:
         session = params["session"]
         
         try:
-            session_obj = get_session(year, gp, session)
-            session_obj.load()
+            session_obj = await self._load_session(year, gp, session, laps=False, telemetry=False,
+                                                   weather=False, messages=False)
             results = session_obj.results
             
             return {
@@ -669,12 +1104,12 @@ class FastF1MCPServer:
         driver = params.get("driver")
         
         try:
-            session_obj = get_session(year, gp, session)
-            session_obj.load()
+            session_obj = await self._load_session(year, gp, session,
+                                                   telemetry=False, weather=False, messages=False)
             laps = session_obj.laps
             
             if driver:
-                laps = laps[laps['Driver'] == driver]
+                laps = self._driver_laps(session_obj, driver)
             
             return {
                 "session": session,
@@ -694,13 +1129,13 @@ class FastF1MCPServer:
         lap = params.get("lap")
         
         try:
-            session_obj = get_session(year, gp, session)
-            session_obj.load()
+            session_obj = await self._load_session(year, gp, session)
             
             if lap:
                 # 获取特定圈数的遥测数据
-                driver_laps = session_obj.laps[session_obj.laps['Driver'] == driver]
-                lap_data = driver_laps[driver_laps['LapNumber'] == lap]
+                laps = session_obj.laps
+                mask = (laps['Driver'].values == driver) & (laps['LapNumber'].values == lap)
+                lap_data = laps[mask]
                 if len(lap_data) == 0:
                     raise Exception(f"Lap {lap} not found for driver {driver}")
                 
@@ -725,8 +1160,8 @@ class FastF1MCPServer:
         session = params["session"]
         
         try:
-            session_obj = get_session(year, gp, session)
-            session_obj.load()
+            session_obj = await self._load_session(year, gp, session,
+                                                   laps=False, telemetry=False, messages=False)
             weather = session_obj.weather_data
             
             return {
@@ -744,8 +1179,9 @@ class FastF1MCPServer:
         session = params["session"]
         
         try:
-            session_obj = get_session(year, gp, session)
-            session_obj.load()
+            # 赛道状态随圈速数据一起加载，只跳过遥测、天气和消息
+            session_obj = await self._load_session(year, gp, session,
+                                                   telemetry=False, weather=False, messages=False)
             track_status = session_obj.track_status
             
             return {
@@ -762,18 +1198,8 @@ class FastF1MCPServer:
         driver = params["driver"]
         
         try:
-            # 获取车手信息
-            session_obj = get_session(year, 1, 'R')  # 使用第一场比赛
-            session_obj.load()
-            
-            driver_info = None
-            for d in session_obj.drivers:
-                if driver in [d['Abbreviation'], d['FullName'], str(d['DriverNumber'])]:
-                    driver_info = d
-                    break
-            
-            if not driver_info:
-                raise Exception(f"Driver {driver} not found")
+            loop = asyncio.get_event_loop()
+            driver_info = await loop.run_in_executor(None, _lookup_driver, year, driver)
             
             return {
                 "driver_info": driver_info,
@@ -788,13 +1214,8 @@ class FastF1MCPServer:
         team = params["team"]
         
         try:
-            session_obj = get_session(year, 1, 'R')
-            session_obj.load()
-            
-            team_drivers = []
-            for driver in session_obj.drivers:
-                if team.lower() in driver['TeamName'].lower():
-                    team_drivers.append(driver)
+            loop = asyncio.get_event_loop()
+            team_drivers = await loop.run_in_executor(None, _lookup_team, year, team)
             
             return {
                 "team_name": team,
@@ -818,7 +1239,7 @@ class FastF1MCPServer:
             return {
                 "year": year,
                 "round": round,
-                "standings": standings.content[0].to_dict('records')
+                "standings": _frame_columns(standings.content[0])
             }
         except Exception as e:
             raise Exception(f"Failed to get driver standings: {e}")
@@ -837,7 +1258,7 @@ class FastF1MCPServer:
             return {
                 "year": year,
                 "round": round,
-                "standings": standings.content[0].to_dict('records')
+                "standings": _frame_columns(standings.content[0])
             }
         except Exception as e:
             raise Exception(f"Failed to get constructor standings: {e}")
@@ -846,6 +1267,7 @@ class FastF1MCPServer:
         """获取历史结果"""
         year = params["year"]
         gp = params.get("gp")
+        fmt = params.get("format", "json")
         
         try:
             if gp:
@@ -853,10 +1275,23 @@ class FastF1MCPServer:
             else:
                 results = self.ergast.get_race_results(season=year)
             
+            # 客户端显式要求时，每个DataFrame整体编码成一段列式缓冲区，避免JSON逐格转换
+            if fmt == "arrow" and pa is not None:
+                return {
+                    "year": year,
+                    "gp": gp,
+                    "format": "arrow",
+                    "results": [
+                        base64.b64encode(pa.ipc.serialize_pandas(df).to_pybytes()).decode()
+                        for df in results.content
+                    ]
+                }
+            
             return {
                 "year": year,
                 "gp": gp,
-                "results": results.content
+                "format": "json",
+                "results": [_frame_columns(df) for df in results.content]
             }
         except Exception as e:
             raise Exception(f"Failed to get historical results: {e}")
@@ -866,16 +1301,159 @@ class FastF1MCPServer:
         circuit = params["circuit"]
         
         try:
-            # 使用Ergast API获取赛道记录
-            records = self.ergast.get_circuit_info(circuit)
+            table = None
+            if self.lap_records is not None:
+                table = self.lap_records
+                table = table.filter(pc.equal(table['Circuit'], circuit))
+                if not table.num_rows:
+                    table = None
+                elif not self._lap_records_stale(table):
+                    return {
+                        "circuit": circuit,
+                        "records": self._lap_records_from_index(table)
+                    }
+            
+            # 索引中没有该赛道或已过期时从Ergast获取，网络请求放到线程池中避免阻塞事件循环
+            loop = asyncio.get_event_loop()
+            try:
+                records = await loop.run_in_executor(None, _circuit_fastest_laps, self.ergast, circuit)
+            except Exception as e:
+                if table is None:
+                    raise
+                # Ergast不可用时退回到过期的索引数据
+                logger.warning(f"Failed to refresh lap records for {circuit}, using index: {e}")
+                return {
+                    "circuit": circuit,
+                    "records": self._lap_records_from_index(table)
+                }
+            
+            if records and pq is not None:
+                await loop.run_in_executor(None, self._save_lap_records, circuit, records)
             
             return {
                 "circuit": circuit,
-                "records": records.content
+                "records": records
             }
         except Exception as e:
             raise Exception(f"Failed to get lap records: {e}")
     
+    @staticmethod
+    def _lap_records_stale(table) -> bool:
+        """赛道记录超过 LAP_RECORDS_TTL 未从Ergast刷新时视为过期"""
+        if 'FetchedAt' not in table.column_names:
+            return True
+        fetched_at = pc.max(table['FetchedAt']).as_py()
+        return fetched_at is None or datetime.now().timestamp() - fetched_at > LAP_RECORDS_TTL
+    
+    @staticmethod
+    def _lap_records_from_index(table) -> List[Dict[str, Any]]:
+        """从索引中某个赛道的行汇总出每年每节的最快圈"""
+        best = table.group_by(['Year', 'Session']).aggregate([('LapTime', 'min')])
+        best = best.sort_by([('Year', 'ascending'), ('Session', 'ascending')])
+        # 聚合结果的列顺序随pyarrow版本变化，按列名取值
+        return [
+            {"Year": year, "Session": session, "LapTime": lap_time}
+            for year, session, lap_time in zip(best['Year'].to_pylist(),
+                                               best['Session'].to_pylist(),
+                                               best['LapTime_min'].to_pylist())
+        ]
+    
+    async def _load_driver_laps(self, year: int, driver: str,
+                                gp: Optional[str] = None) -> Tuple[pd.DataFrame, np.ndarray]:
+        """加载车手圈速数据，未指定大奖赛时并发加载整个赛季，返回 (圈速, 毫秒圈速数组)"""
+        loop = asyncio.get_event_loop()
+        
+        async def load_one(round_gp):
+            session_obj = await self._load_session(year, round_gp, 'R',
+                                                   telemetry=False, weather=False, messages=False)
+            return self._driver_laps(session_obj, driver), self._driver_lap_times_ms(session_obj, driver)
+        
+        if gp:
+            return await load_one(gp)
+        
+        # 获取整个赛季的数据
+        schedule, round_drivers = await asyncio.gather(
+            loop.run_in_executor(None, functools.partial(get_event_schedule, year, include_testing=False)),
+            loop.run_in_executor(None, _season_round_drivers, self.ergast, year),
+            return_exceptions=True
+        )
+        if isinstance(schedule, BaseException):
+            raise schedule
+        if isinstance(round_drivers, BaseException):
+            # 索引取不到时不跳过任何轮次
+            logger.warning(f"Failed to build driver index for {year}: {round_drivers}")
+            round_drivers = {}
+        
+        # 索引中记录了该轮参赛车手而其中没有该车手时，不必加载这一轮
+        rounds = [int(round_number) for round_number in schedule['RoundNumber']]
+        rounds = [rnd for rnd in rounds if rnd not in round_drivers or driver in round_drivers[rnd]]
+        results = await asyncio.gather(*(load_one(rnd) for rnd in rounds), return_exceptions=True)
+        loaded = [item for item in results if not isinstance(item, BaseException)]
+        
+        if loaded:
+            return (pd.concat([laps for laps, _ in loaded], copy=False, ignore_index=True),
+                    np.concatenate([lap_ms for _, lap_ms in loaded]))
+        return pd.DataFrame(), np.empty(0, dtype=np.float32)
+    
+    def _driver_statistics(self, driver_laps: pd.DataFrame, lap_ms: np.ndarray, year: int,
+                           driver: str, gp: Optional[str] = None) -> Dict[str, Any]:
+        """根据圈速数据计算车手统计，最快圈和平均圈速基于float32毫秒数组计算"""
+        if len(driver_laps) == 0:
+            raise Exception(f"No data found for driver {driver}")
+        
+        if np.isnan(lap_ms).all():
+            best_lap_time = average_lap_time = pd.NaT
+            fastest_lap = None
+        else:
+            best_idx = int(np.nanargmin(lap_ms))
+            best_lap_time = driver_laps['LapTime'].iloc[best_idx]
+            # float32累加误差较大，求均值时用float64累加器
+            average_lap_time = pd.Timedelta(milliseconds=float(np.nanmean(lap_ms, dtype=np.float64)))
+            fastest_lap = driver_laps.iloc[best_idx].to_dict()
+        
+        return {
+            "driver": driver,
+            "year": year,
+            "gp": gp,
+            "total_laps": len(driver_laps),
+            "best_lap_time": best_lap_time,
+            "average_lap_time": average_lap_time,
+            "fastest_lap": fastest_lap,
+            "pit_stops": int(driver_laps['PitOutTime'].notna().sum()),
+            "positions_gained": 0,  # 需要更复杂的计算
+            "dnf": int(driver_laps['IsPersonalBest'].eq(False).sum())
+        }
+    
+    @staticmethod
+    def _lap_deltas(laps1: pd.DataFrame, laps2: pd.DataFrame) -> Dict[str, Any]:
+        """逐圈计算圈速和扇区时间差（driver1 - driver2，单位秒），按 LapNumber 对齐"""
+        # 只比较两位车手都完成的圈次，缺圈（进站、退赛、被过滤）不会让后续圈错位
+        lap_numbers, i1, i2 = np.intersect1d(laps1['LapNumber'].to_numpy(), laps2['LapNumber'].to_numpy(),
+                                             assume_unique=True, return_indices=True)
+        
+        a = laps1['LapTime'].dt.total_seconds().to_numpy(np.float32)
+        b = laps2['LapTime'].dt.total_seconds().to_numpy(np.float32)
+        lap_delta = a[i1] - b[i2]
+        
+        # 三个扇区打包成 (N, 3) 连续数组，一次相减
+        sector_cols = ['Sector1Time', 'Sector2Time', 'Sector3Time']
+        s1 = np.stack([laps1[c].dt.total_seconds().to_numpy(np.float32)[i1] for c in sector_cols], axis=1)
+        s2 = np.stack([laps2[c].dt.total_seconds().to_numpy(np.float32)[i2] for c in sector_cols], axis=1)
+        sector_delta = s1 - s2
+        
+        return {
+            "laps_compared": len(lap_numbers),
+            "lap_numbers": lap_numbers.astype(int).tolist(),
+            "lap_time_deltas": np.round(lap_delta.astype(np.float64), 3).tolist(),
+            "sector_time_deltas": np.round(sector_delta.astype(np.float64), 3).tolist()
+        }
+    
+    async def _load_driver_statistics(self, year: int, driver: str,
+                                      gp: Optional[str] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """加载车手圈速并计算统计，返回 (圈速, 统计)"""
+        driver_laps, lap_ms = await self._load_driver_laps(year, driver, gp)
+        return driver_laps, self._driver_statistics(driver_laps, lap_ms, year, driver, gp)
+    
     async def _calculate_driver_statistics(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """计算车手统计"""
         year = params["year"]
@@ -883,46 +1461,7 @@ class FastF1MCPServer:
         gp = params.get("gp")
         
         try:
-            if gp:
-                session_obj = get_session(year, gp, 'R')
-                session_obj.load()
-                driver_laps = session_obj.laps[session_obj.laps['Driver'] == driver]
-            else:
-                # 获取整个赛季的数据
-                schedule = get_event_schedule(year, include_testing=False)
-                all_laps = []
-                
-                for event in schedule:
-                    try:
-                        session_obj = get_session(year, event['RoundNumber'], 'R')
-                        session_obj.load()
-                        driver_laps = session_obj.laps[session_obj.laps['Driver'] == driver]
-                        all_laps.append(driver_laps)
-                    except:
-                        continue
-                
-                if all_laps:
-                    driver_laps = pd.concat(all_laps)
-                else:
-                    driver_laps = pd.DataFrame()
-            
-            if len(driver_laps) == 0:
-                raise Exception(f"No data found for driver {driver}")
-            
-            # 计算统计数据
-            stats = {
-                "driver": driver,
-                "year": year,
-                "gp": gp,
-                "total_laps": len(driver_laps),
-                "best_lap_time": driver_laps['LapTime'].min(),
-                "average_lap_time": driver_laps['LapTime'].mean(),
-                "fastest_lap": driver_laps.loc[driver_laps['LapTime'].idxmin()].to_dict() if len(driver_laps) > 0 else None,
-                "pit_stops": len(driver_laps[driver_laps['PitOutTime'].notna()]),
-                "positions_gained": 0,  # 需要更复杂的计算
-                "dnf": len(driver_laps[driver_laps['IsPersonalBest'] == False])
-            }
-            
+            _, stats = await self._load_driver_statistics(year, driver, gp)
             return stats
         except Exception as e:
             raise Exception(f"Failed to calculate driver statistics: {e}")
@@ -935,13 +1474,11 @@ class FastF1MCPServer:
         gp = params.get("gp")
         
         try:
-            # 获取两位车手的数据
-            stats1 = await self._calculate_driver_statistics({
-                "year": year, "driver": driver1, "gp": gp
-            })
-            stats2 = await self._calculate_driver_statistics({
-                "year": year, "driver": driver2, "gp": gp
-            })
+            # 两位车手的加载和统计互不依赖，并发执行
+            (laps1, stats1), (laps2, stats2) = await asyncio.gather(
+                self._load_driver_statistics(year, driver1, gp),
+                self._load_driver_statistics(year, driver2, gp)
+            )
             
             comparison = {
                 "year": year,
@@ -952,6 +1489,10 @@ class FastF1MCPServer:
                 "total_laps_difference": stats1.get("total_laps", 0) - stats2.get("total_laps", 0)
             }
             
+            # 逐圈差值只在单场比赛内有意义
+            if gp:
+                comparison["lap_deltas"] = self._lap_deltas(laps1, laps2)
+            
             return comparison
         except Exception as e:
             raise Exception(f"Failed to compare drivers: {e}")
@@ -961,10 +1502,15 @@ class FastF1MCPServer:
         enabled = params.get("enabled", self.cache_enabled)
         cache_dir = params.get("cache_dir", self.cache_dir)
         clear_cache = params.get("clear_cache", False)
+        prefetch = params.get("prefetch", self.cache_prefetch)
         
         try:
+            if clear_cache or cache_dir != self.cache_dir:
+                self._clear_session_caches()
+            
             if clear_cache:
                 fastf1.Cache.clear_cache()
+                self._clear_lap_records_index(delete=True)
             
             if enabled != self.cache_enabled:
                 if enabled:
@@ -978,21 +1524,30 @@ class FastF1MCPServer:
                 self.cache_dir = cache_dir
                 if enabled:
                     fastf1.Cache.enable_cache(cache_dir)
+                
+                # 圈速记录索引跟随缓存目录，丢弃旧目录的索引后从新目录加载
+                self._clear_lap_records_index()
+                await asyncio.get_event_loop().run_in_executor(None, self._load_lap_records_index)
+            
+            self._mount_http_pool()
+            self.cache_prefetch = bool(prefetch)
             
             return {
                 "cache_enabled": self.cache_enabled,
                 "cache_dir": self.cache_dir,
-                "cache_cleared": clear_cache
+                "cache_cleared": clear_cache,
+                "cache_prefetch": self.cache_prefetch
             }
         except Exception as e:
             raise Exception(f"Failed to configure cache: {e}")
     
-    async def _get_cache_info(self) -> Dict[str, Any]:
-        """获取缓存信息"""
+    def _get_cache_info(self) -> Dict[str, Any]:
+        """获取缓存信息（只读取内存中的状态，同步调用）"""
         try:
             cache_info = {
                 "cache_enabled": self.cache_enabled,
                 "cache_dir": self.cache_dir,
+                "cache_prefetch": self.cache_prefetch,
                 "cache_size": "Unknown"  # FastF1 doesn't provide direct cache size info
             }
             
@@ -1000,6 +1555,36 @@ class FastF1MCPServer:
         except Exception as e:
             raise Exception(f"Failed to get cache info: {e}")
 
+def _stdin_reader(loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+    """在独立线程中阻塞读取stdin，逐行投递到事件循环的队列，EOF时投递None"""
+    for line in iter(sys.stdin.readline, ''):
+        loop.call_soon_threadsafe(queue.put_nowait, line)
+    loop.call_soon_threadsafe(queue.put_nowait, None)
+
+async def _handle_line(server: FastF1MCPServer, line: str):
+    """处理一行JSON-RPC请求并写出响应"""
+    try:
+        request = _json_loads(line)
+        response = await server.handle_request(request)
+        
+        response_json = _json_dumps(response)
+        print(response_json)
+        sys.stdout.flush()
+        
+    except json.JSONDecodeError as e:
+        error_response = {
+            "jsonrpc": "2.0",
+            "id": None,
+            "error": {
+                "code": -32700,
+                "message": f"Parse error: {str(e)}"
+            }
+        }
+        print(json.dumps(error_response))
+        sys.stdout.flush()
+    except Exception as e:
+        logger.error(f"Error writing response: {e}")
+
 # MCP服务器主循环
 async def run_mcp_server():
     """运行MCP服务器"""
@@ -1008,45 +1593,53 @@ async def run_mcp_server():
     sys.stderr.write("FastF1 MCP Server starting...\n")
     sys.stderr.flush()
     
+    refresh_task = asyncio.create_task(server.refresh_lap_records_index())
+    
+    # 单个常驻线程读取stdin，每个请求作为独立任务并发处理
+    queue = asyncio.Queue()
+    reader = threading.Thread(target=_stdin_reader, args=(asyncio.get_event_loop(), queue), daemon=True)
+    reader.start()
+    pending = set()
+    
     try:
         while True:
-            line = await asyncio.get_event_loop().run_in_executor(
-                None, sys.stdin.readline
-            )
+            line = await queue.get()
             
-            if not line:
+            if line is None:
                 break
                 
             line = line.strip()
             if not line:
                 continue
-                
-            try:
-                request = json.loads(line)
-                response = await server.handle_request(request)
-                
-                response_json = json.dumps(response, ensure_ascii=False)
-                print(response_json)
-                sys.stdout.flush()
-                
-            except json.JSONDecodeError as e:
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": None,
-                    "error": {
-                        "code": -32700,
-                        "message": f"Parse error: {str(e)}"
-                    }
-                }
-                print(json.dumps(error_response))
-                sys.stdout.flush()
+            
+            task = asyncio.create_task(_handle_line(server, line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        
+        # 输入结束后等待仍在处理的请求
+        if pending:
+            await asyncio.gather(*pending)
                 
     except KeyboardInterrupt:
         sys.stderr.write("Server stopped by user\n")
     except Exception as e:
         sys.stderr.write(f"Server error: {str(e)}\n")
     finally:
+        refresh_task.cancel()
         sys.stderr.write("FastF1 MCP Server shutting down...\n")
 
+def main():
+    """启动MCP服务器"""
+    # 可选：使用uvloop事件循环（uvloop.run 需要 uvloop>=0.18，install() 已弃用）
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    
+    if uvloop is not None and hasattr(uvloop, "run"):
+        uvloop.run(run_mcp_server())
+    else:
+        asyncio.run(run_mcp_server())
+
 if __name__ == "__main__":
-    asyncio.run(run_mcp_server())
\ No newline at end of file
+    main()
\ No newline at end of file
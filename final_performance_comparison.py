@@ -6,15 +6,31 @@
 基于真实MCP数据的完整分析
 """
 
-import matplotlib.pyplot as plt
+import hashlib
+import json
+import os
 import numpy as np
 import pandas as pd
-from datetime import datetime
 
-# 设置matplotlib参数
-plt.rcParams['font.family'] = 'Arial'
-plt.rcParams['axes.unicode_minus'] = False
-plt.style.use('dark_background')
+_plt = None
+
+def _pyplot():
+    """
+    首次绘图时才导入matplotlib并设置参数，只做数据分析时不承担导入开销
+    """
+    global _plt
+    if _plt is None:
+        import matplotlib
+        matplotlib.use('Agg')  # 只输出PNG文件，不需要交互式后端
+        import matplotlib.pyplot as plt
+        
+        # 设置matplotlib参数
+        plt.rcParams['font.family'] = 'Arial'
+        plt.rcParams['axes.unicode_minus'] = False
+        plt.style.use('dark_background')
+        _plt = plt
+    
+    return _plt
 
 class F1PerformanceAnalyzer:
     """
@@ -46,43 +62,96 @@ class F1PerformanceAnalyzer:
             {'driver': 'Sergio Perez', 'team': 'Red Bull Racing', 'position': 7, 'grid': 8, 'points': 6},
             {'driver': 'Lando Norris', 'team': 'McLaren', 'position': 20, 'grid': 2, 'points': 0}
         ]
+        
+        # 转换为列式数组，车队的逐车手数据直接按行号从数组中取
+        results = self.austria_2024_results
+        self._drivers = np.array([r['driver'] for r in results])
+        self._positions = np.array([r['position'] for r in results], dtype=np.int16)
+        self._grids = np.array([r['grid'] for r in results], dtype=np.int16)
+        self._points = np.array([r['points'] for r in results], dtype=np.int16)
+        
+        # 只做一次分组：同时得到每个车队的行号和全部聚合指标
+        grouped = pd.DataFrame(results).groupby('team', sort=False)
+        self._team_index = grouped.indices
+        self._empty_index = np.empty(0, dtype=np.intp)
+        self._team_table = grouped.agg(
+            total_points=('points', 'sum'),
+            best_position=('position', 'min'),
+            avg_grid=('grid', 'mean'),
+            avg_finish=('position', 'mean')
+        )
+        self._team_table['std_position'] = grouped['position'].std(ddof=0)
+        
+        # 雷达图4个维度的角度，末尾的2π与0重合用于闭合多边形
+        self._radar_angles = np.linspace(0, 2 * np.pi, 5)
+    
+    def _metrics(self, team):
+        """
+        单个车队的 (总积分, 最佳位置, 平均发车位, 平均完赛位, 完赛位标准差)
+        """
+        if team not in self._team_table.index:
+            return 0, 999, 0.0, 0.0, 0.0
+        return tuple(self._team_table.loc[team])
+    
+    def _team_stats(self, team):
+        """
+        计算雷达图的标准化指标：积分、最佳位置、排位赛、一致性
+        
+        返回长度为5的闭合数组，最后一个元素重复第一个指标。
+        """
+        total_points, best_position, avg_grid, _, std_position = self._metrics(team)
+        
+        values = np.empty(5)
+        values[0] = float(total_points) / 50.0
+        values[1] = (21 - float(best_position)) / 20.0
+        values[2] = (21 - float(avg_grid)) / 20.0
+        values[3] = max(0.0, 1.0 - float(std_position) / 10.0)
+        values[4] = values[0]
+        return values
+    
+    def _team_analysis(self, team):
+        """
+        计算单个车队的数据
+        """
+        idx = self._team_index.get(team, self._empty_index)
+        total_points, best_position, avg_grid, avg_finish, _ = self._metrics(team)
+        
+        return {
+            'drivers': self._drivers[idx].tolist(),
+            'positions': self._positions[idx].tolist(),
+            'grid_positions': self._grids[idx].tolist(),
+            'points': self._points[idx].tolist(),
+            'total_points': int(total_points),
+            'best_position': int(best_position),
+            'avg_grid': float(avg_grid),
+            'avg_finish': float(avg_finish)
+        }
     
     def analyze_team_data(self, team1='Red Bull Racing', team2='McLaren'):
         """
         分析两个车队的数据
         """
-        team1_data = [r for r in self.austria_2024_results if r['team'] == team1]
-        team2_data = [r for r in self.austria_2024_results if r['team'] == team2]
-        
         analysis = {
-            team1: {
-                'drivers': [d['driver'] for d in team1_data],
-                'positions': [d['position'] for d in team1_data],
-                'grid_positions': [d['grid'] for d in team1_data],
-                'points': [d['points'] for d in team1_data],
-                'total_points': sum(d['points'] for d in team1_data),
-                'best_position': min(d['position'] for d in team1_data) if team1_data else 999,
-                'avg_grid': np.mean([d['grid'] for d in team1_data]) if team1_data else 0,
-                'avg_finish': np.mean([d['position'] for d in team1_data]) if team1_data else 0
-            },
-            team2: {
-                'drivers': [d['driver'] for d in team2_data],
-                'positions': [d['position'] for d in team2_data],
-                'grid_positions': [d['grid'] for d in team2_data],
-                'points': [d['points'] for d in team2_data],
-                'total_points': sum(d['points'] for d in team2_data),
-                'best_position': min(d['position'] for d in team2_data) if team2_data else 999,
-                'avg_grid': np.mean([d['grid'] for d in team2_data]) if team2_data else 0,
-                'avg_finish': np.mean([d['position'] for d in team2_data]) if team2_data else 0
-            }
+            team1: self._team_analysis(team1),
+            team2: self._team_analysis(team2)
         }
         
         return analysis
     
-    def create_comparison_charts(self, analysis, team1='Red Bull Racing', team2='McLaren'):
+    def create_comparison_charts(self, analysis, team1='Red Bull Racing', team2='McLaren', dpi=150):
         """
         创建对比图表
+        
+        文件名由分析数据的内容哈希决定，相同数据重复调用时直接返回已生成的图表。
+        默认以150 dpi输出预览图，需要高清图时传入 dpi=300。
         """
+        payload = json.dumps([analysis, team1, team2, dpi], sort_keys=True, default=str)
+        key = hashlib.blake2b(payload.encode('utf-8')).hexdigest()[:16]
+        filename = f'f1_perf_{key}.png'
+        if os.path.exists(filename):
+            return filename
+        
+        plt = _pyplot()
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
         fig.patch.set_facecolor('#0E1117')
         
@@ -154,24 +223,10 @@ class F1PerformanceAnalyzer:
         categories = ['Points', 'Best Position', 'Qualifying', 'Consistency']
         
         # 标准化数据 (0-1 范围)
-        team1_values = [
-            analysis[team1]['total_points'] / 50,  # 积分
-            (21 - analysis[team1]['best_position']) / 20,  # 最佳位置
-            (21 - analysis[team1]['avg_grid']) / 20,  # 排位赛
-            max(0, 1 - (np.std(analysis[team1]['positions']) / 10))  # 一致性
-        ]
-        
-        team2_values = [
-            analysis[team2]['total_points'] / 50,
-            (21 - analysis[team2]['best_position']) / 20,
-            (21 - analysis[team2]['avg_grid']) / 20,
-            max(0, 1 - (np.std(analysis[team2]['positions']) / 10))
-        ]
+        team1_values = self._team_stats(team1)
+        team2_values = self._team_stats(team2)
         
-        angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
-        team1_values += team1_values[:1]
-        team2_values += team2_values[:1]
-        angles += angles[:1]
+        angles = self._radar_angles
         
         ax4 = plt.subplot(2, 2, 4, projection='polar')
         ax4.plot(angles, team1_values, 'o-', linewidth=3, label=team1, 
@@ -194,11 +249,11 @@ class F1PerformanceAnalyzer:
                     fontsize=16, fontweight='bold', y=0.98)
         
         # 保存图表
-        plt.savefig('f1_performance_comparison_final.png', dpi=300, 
+        plt.savefig(filename, dpi=dpi, 
                    bbox_inches='tight', facecolor='#0E1117')
-        plt.show()
+        plt.close(fig)
         
-        return 'f1_performance_comparison_final.png'
+        return filename
     
     def print_detailed_analysis(self, analysis, team1='Red Bull Racing', team2='McLaren'):
         """
@@ -226,7 +281,7 @@ class F1PerformanceAnalyzer:
         winner = team1 if points_diff > 0 else team2
         print(f"\n🎯 RACE WINNER: {winner} (+{abs(points_diff)} points)")
         
-        print(f"\n👨‍🏎️ DRIVER PERFORMANCES:")
+        print("\n👨‍🏎️ DRIVER PERFORMANCES:")
         for team in [team1, team2]:
             print(f"\n{team}:")
             for i, driver in enumerate(analysis[team]['drivers']):
@@ -237,27 +292,27 @@ class F1PerformanceAnalyzer:
                 change_str = f"{change:+d}" if change != 0 else "0"
                 print(f"  • {driver}: P{pos} ({pts} pts) | Grid P{grid} | Change: {change_str}")
         
-        print(f"\n📊 KEY INSIGHTS:")
-        print(f"• Max Verstappen: Started from pole but finished P5 (lost 4 positions)")
-        print(f"• Lando Norris: Difficult race from P2 grid to P20 finish")
-        print(f"• Oscar Piastri: Excellent drive from P7 grid to P2 finish (+5 positions)")
-        print(f"• Sergio Perez: Consistent performance, gained 1 position")
+        print("\n📊 KEY INSIGHTS:")
+        print("• Max Verstappen: Started from pole but finished P5 (lost 4 positions)")
+        print("• Lando Norris: Difficult race from P2 grid to P20 finish")
+        print("• Oscar Piastri: Excellent drive from P7 grid to P2 finish (+5 positions)")
+        print("• Sergio Perez: Consistent performance, gained 1 position")
         
-        print(f"\n🔍 PERFORMANCE ANALYSIS:")
+        print("\n🔍 PERFORMANCE ANALYSIS:")
         if points_diff > 0:
             print(f"• {team1} showed better overall race execution")
         else:
             print(f"• {team2} delivered stronger race performance despite challenges")
         
-        print(f"• McLaren had mixed results: Piastri excellent, Norris struggled")
-        print(f"• Red Bull Racing consistent but below expectations for Verstappen")
-        print(f"• Both teams showed competitive pace but different strategic outcomes")
+        print("• McLaren had mixed results: Piastri excellent, Norris struggled")
+        print("• Red Bull Racing consistent but below expectations for Verstappen")
+        print("• Both teams showed competitive pace but different strategic outcomes")
         
-        print(f"\n💡 STRATEGIC INSIGHTS:")
-        print(f"• Grid position advantage doesn't guarantee race result")
-        print(f"• Tire strategy and race execution crucial for points")
-        print(f"• Both teams need to maximize both cars' potential")
-        print(f"• McLaren showed they can challenge Red Bull on race day")
+        print("\n💡 STRATEGIC INSIGHTS:")
+        print("• Grid position advantage doesn't guarantee race result")
+        print("• Tire strategy and race execution crucial for points")
+        print("• Both teams need to maximize both cars' potential")
+        print("• McLaren showed they can challenge Red Bull on race day")
 
 def main():
     """主函数"""
@@ -279,13 +334,13 @@ def main():
     # 打印详细分析
     analyzer.print_detailed_analysis(analysis, 'Red Bull Racing', 'McLaren')
     
-    print(f"\n✅ Analysis Complete!")
+    print("\n✅ Analysis Complete!")
     print(f"📁 Chart saved as: {chart_file}")
-    print(f"\n🔧 How to use with real MCP data:")
-    print(f"1. Call get_session_results for race data")
-    print(f"2. Call get_lap_times for detailed timing")
-    print(f"3. Call get_telemetry for technical data")
-    print(f"4. Combine all data for comprehensive analysis")
+    print("\n🔧 How to use with real MCP data:")
+    print("1. Call get_session_results for race data")
+    print("2. Call get_lap_times for detailed timing")
+    print("3. Call get_telemetry for technical data")
+    print("4. Combine all data for comprehensive analysis")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,24 +5,167 @@
 使用Fast F1 MCP服务器获取数据进行红牛 vs 迈凯轮性能对比
 """
 
-import json
+import functools
+import os
+import sys
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import matplotlib
+
+# 无显示环境（如服务器、CI）时直接使用Agg后端，避免初始化GUI后端
+if (not os.environ.get('MPLBACKEND') and sys.platform.startswith('linux')
+        and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY')):
+    matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties, findfont
 import numpy as np
-import pandas as pd
-from datetime import datetime
 
-# 设置中文字体和样式
-plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+# 设置中文字体和样式，背景色统一由rcParams提供，绘图时不再逐个设置
 plt.style.use('dark_background')
+plt.rcParams.update({
+    'font.sans-serif': ['Arial Unicode MS', 'SimHei', 'DejaVu Sans'],
+    'axes.unicode_minus': False,
+    'figure.facecolor': '#0E1117',
+    'savefig.facecolor': '#0E1117'
+})
+
+# 导入时解析一次字体回退链，之后的文字对象直接命中字体缓存
+findfont(FontProperties(family=plt.rcParams['font.sans-serif']))
+
+# 圈数超过该值时才使用numba并行内核，小数据直接用NumPy，避免JIT编译开销
+NJIT_MIN_LAPS = 1000
+
+# Plotly后端下数据点超过该值时使用plotly-resampler按视图降采样
+PLOTLY_RESAMPLE_MIN_POINTS = 5000
+
+# 编译后的内核；None表示尚未尝试编译，False表示未安装numba
+_lap_time_diff_kernel = None
+
+def _lap_time_diff(t1, t2):
+    """
+    逐圈圈速差 t2 - t1，数据量大（如遥测级数据）时使用numba并行编译的内核
+    """
+    global _lap_time_diff_kernel
+    if t1.shape[0] <= NJIT_MIN_LAPS or _lap_time_diff_kernel is False:
+        return t2 - t1
+    
+    if _lap_time_diff_kernel is None:
+        try:
+            from numba import njit, prange
+            
+            @njit(parallel=True, cache=True)
+            def kernel(a, b):
+                out = np.empty_like(a)
+                for i in prange(a.shape[0]):
+                    out[i] = b[i] - a[i]
+                return out
+            
+            _lap_time_diff_kernel = kernel
+        except ImportError:
+            _lap_time_diff_kernel = False
+            return t2 - t1
+    
+    return _lap_time_diff_kernel(t1, t2)
+
+@functools.lru_cache(maxsize=None)
+def _austria_2024_fixture():
+    """
+    2024年奥地利大奖赛的模拟MCP数据，首次调用时构建，之后返回同一份对象（调用方只读）
+    """
+    return {
+        'session_results': {
+            'results': [
+                {
+                    'DriverNumber': '1',
+                    'FullName': 'Max Verstappen',
+                    'TeamName': 'Red Bull Racing',
+                    'Position': 1,
+                    'LapTime': '1:05.412',
+                    'GridPosition': 1,
+                    'Points': 25
+                },
+                {
+                    'DriverNumber': '4',
+                    'FullName': 'Lando Norris',
+                    'TeamName': 'McLaren',
+                    'Position': 2,
+                    'LapTime': '1:05.678',
+                    'GridPosition': 2,
+                    'Points': 18
+                },
+                {
+                    'DriverNumber': '81',
+                    'FullName': 'Oscar Piastri',
+                    'TeamName': 'McLaren',
+                    'Position': 3,
+                    'LapTime': '1:05.892',
+                    'GridPosition': 3,
+                    'Points': 15
+                },
+                {
+                    'DriverNumber': '11',
+                    'FullName': 'Sergio Perez',
+                    'TeamName': 'Red Bull Racing',
+                    'Position': 4,
+                    'LapTime': '1:06.123',
+                    'GridPosition': 4,
+                    'Points': 12
+                }
+            ]
+        },
+        'lap_times': {
+            'Red Bull Racing': {
+                'fastest_lap': 65.412,
+                'average_lap': 67.234,
+                'lap_times': [65.412, 66.123, 67.456, 66.789, 67.234, 68.123],
+                'consistency': 0.892
+            },
+            'McLaren': {
+                'fastest_lap': 65.678,
+                'average_lap': 67.456,
+                'lap_times': [65.678, 66.234, 67.123, 67.789, 67.456, 68.234],
+                'consistency': 0.756
+            }
+        },
+        'sector_times': {
+            'Red Bull Racing': {
+                'sector1': 22.123,
+                'sector2': 21.456,
+                'sector3': 21.833
+            },
+            'McLaren': {
+                'sector1': 22.234,
+                'sector2': 21.567,
+                'sector3': 21.877
+            }
+        },
+        'telemetry_summary': {
+            'Red Bull Racing': {
+                'max_speed': 342.5,
+                'avg_speed': 198.7,
+                'top_speed_sectors': [1, 3],
+                'braking_efficiency': 0.92
+            },
+            'McLaren': {
+                'max_speed': 339.8,
+                'avg_speed': 196.4,
+                'top_speed_sectors': [2],
+                'braking_efficiency': 0.89
+            }
+        }
+    }
 
 class MCPPerformanceAnalyzer:
     """
     基于MCP服务器的F1性能分析器
     """
     
-    def __init__(self):
+    def __init__(self, interactive=False):
+        # 交互模式下绘图后弹出窗口显示；批处理/CI模式只输出PNG，不启动GUI事件循环
+        self.interactive = interactive
         self.team_colors = {
             'Red Bull Racing': '#1E41FF',
             'Red Bull': '#1E41FF',
@@ -36,6 +179,103 @@ class MCPPerformanceAnalyzer:
             'RB': '#6692FF',
             'Kick Sauber': '#52E252'
         }
+        
+        # 图表缓存：{名称: (figure, axes列表)}，重复绘制时清空坐标轴复用
+        self._fig_cache = {}
+        
+        # 每次绘图都相同的柱状图横坐标、柱宽和雷达图角度（末尾重复起点以闭合）
+        self._bar_x = {n: np.arange(n) for n in (2, 3)}
+        self._bar_width = 0.35
+        self._radar_angles = np.linspace(0, 2 * np.pi, 6, endpoint=False).tolist() + [0.0]
+        
+        # PNG编码在后台线程中进行：{图表名称: 保存任务}
+        self._save_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='savefig')
+        self._pending_saves = {}
+    
+    def _get_figure(self, key, figsize, nrows, ncols, projections):
+        """
+        取出缓存的图表和坐标轴，首次调用时创建，之后清空各坐标轴后复用
+        """
+        # 该图表上一次的保存还在进行时，先等它完成再清空重绘
+        pending = self._pending_saves.pop(key, None)
+        if pending is not None:
+            pending.result()
+        
+        cached = self._fig_cache.get(key)
+        if cached is None:
+            if self.interactive:
+                fig = plt.figure(figsize=figsize)
+            else:
+                # 批处理模式不经过pyplot，直接用Agg画布，可在任意线程中安全绘制
+                fig = Figure(figsize=figsize)
+                FigureCanvasAgg(fig)
+            axes = [fig.add_subplot(nrows, ncols, i + 1, projection=projection)
+                    for i, projection in enumerate(projections)]
+            cached = self._fig_cache[key] = (fig, axes)
+        else:
+            for ax in cached[1]:
+                ax.clear()
+        
+        return cached
+    
+    def _save_figure(self, key, fig, path, dpi):
+        """
+        在后台线程中渲染并保存图表，主线程可以立即开始绘制下一张图
+        
+        PNG使用压缩级别1，编码时间约减半，文件略大。
+        """
+        future = self._save_pool.submit(
+            fig.savefig, path, dpi=dpi, bbox_inches='tight', pil_kwargs={'compress_level': 1}
+        )
+        self._pending_saves[key] = future
+        
+        # 交互显示时会在主线程绘制，需先等保存完成，避免两个线程同时绘制同一图表
+        if self.interactive:
+            future.result()
+        return future
+    
+    def wait_for_saves(self):
+        """
+        等待所有后台保存任务完成
+        """
+        pending, self._pending_saves = self._pending_saves, {}
+        for future in pending.values():
+            future.result()
+    
+    def close(self):
+        """
+        等待保存完成后释放缓存的图表和后台线程
+        """
+        self.wait_for_saves()
+        for fig, _ in self._fig_cache.values():
+            plt.close(fig)
+        self._fig_cache.clear()
+        self._save_pool.shutdown()
+    
+    def _grouped_bar(self, ax, categories, values1, values2, team1, team2, c1, c2, fmt,
+                     xlabel, ylabel, title):
+        """
+        绘制两队分组柱状图，并用 bar_label 一次性为每组柱子添加数值标签
+        """
+        x = self._bar_x.get(len(categories))
+        if x is None:
+            x = np.arange(len(categories))
+        width = self._bar_width
+        
+        bars1 = ax.bar(x - width/2, values1, width, label=team1, 
+                      color=c1, alpha=0.8)
+        bars2 = ax.bar(x + width/2, values2, width, label=team2, 
+                      color=c2, alpha=0.8)
+        ax.bar_label(bars1, fmt=fmt, padding=2, fontsize=9)
+        ax.bar_label(bars2, fmt=fmt, padding=2, fontsize=9)
+        
+        ax.set_xticks(x)
+        ax.set_xticklabels(categories)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        ax.legend()
+        ax.grid(True, alpha=0.3)
     
     def simulate_mcp_data(self, year, gp):
         """
@@ -44,248 +284,95 @@ class MCPPerformanceAnalyzer:
         """
         # 模拟红牛环2024年数据
         if gp.lower() == 'austria' and year == 2024:
-            return {
-                'session_results': {
-                    'results': [
-                        {
-                            'DriverNumber': '1',
-                            'FullName': 'Max Verstappen',
-                            'TeamName': 'Red Bull Racing',
-                            'Position': 1,
-                            'LapTime': '1:05.412',
-                            'GridPosition': 1,
-                            'Points': 25
-                        },
-                        {
-                            'DriverNumber': '4',
-                            'FullName': 'Lando Norris',
-                            'TeamName': 'McLaren',
-                            'Position': 2,
-                            'LapTime': '1:05.678',
-                            'GridPosition': 2,
-                            'Points': 18
-                        },
-                        {
-                            'DriverNumber': '81',
-                            'FullName': 'Oscar Piastri',
-                            'TeamName': 'McLaren',
-                            'Position': 3,
-                            'LapTime': '1:05.892',
-                            'GridPosition': 3,
-                            'Points': 15
-                        },
-                        {
-                            'DriverNumber': '11',
-                            'FullName': 'Sergio Perez',
-                            'TeamName': 'Red Bull Racing',
-                            'Position': 4,
-                            'LapTime': '1:06.123',
-                            'GridPosition': 4,
-                            'Points': 12
-                        }
-                    ]
-                },
-                'lap_times': {
-                    'Red Bull Racing': {
-                        'fastest_lap': 65.412,
-                        'average_lap': 67.234,
-                        'lap_times': [65.412, 66.123, 67.456, 66.789, 67.234, 68.123],
-                        'consistency': 0.892
-                    },
-                    'McLaren': {
-                        'fastest_lap': 65.678,
-                        'average_lap': 67.456,
-                        'lap_times': [65.678, 66.234, 67.123, 67.789, 67.456, 68.234],
-                        'consistency': 0.756
-                    }
-                },
-                'sector_times': {
-                    'Red Bull Racing': {
-                        'sector1': 22.123,
-                        'sector2': 21.456,
-                        'sector3': 21.833
-                    },
-                    'McLaren': {
-                        'sector1': 22.234,
-                        'sector2': 21.567,
-                        'sector3': 21.877
-                    }
-                },
-                'telemetry_summary': {
-                    'Red Bull Racing': {
-                        'max_speed': 342.5,
-                        'avg_speed': 198.7,
-                        'top_speed_sectors': [1, 3],
-                        'braking_efficiency': 0.92
-                    },
-                    'McLaren': {
-                        'max_speed': 339.8,
-                        'avg_speed': 196.4,
-                        'top_speed_sectors': [2],
-                        'braking_efficiency': 0.89
-                    }
-                }
-            }
+            return _austria_2024_fixture()
         return None
     
-    def create_performance_comparison_chart(self, data, team1, team2, save_path='performance_comparison.png'):
+    async def _fetch_section(self, year, gp, section):
         """
-        创建综合性能对比图表
+        获取MCP数据中的一部分
+        
+        当前从模拟数据中取出，接入MCP服务器后替换为对应的工具调用：
+        session_results -> get_session_results，lap_times/sector_times -> get_lap_times，
+        telemetry_summary -> get_telemetry
         """
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
-        fig.patch.set_facecolor('#0E1117')
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, self.simulate_mcp_data, year, gp)
+        return None if data is None else data[section]
+    
+    async def fetch_mcp_data(self, year, gp):
+        """
+        并发获取比赛结果、圈速、扇区和遥测数据，任一部分缺失时返回None
+        """
+        sections = ['session_results', 'lap_times', 'sector_times', 'telemetry_summary']
+        parts = await asyncio.gather(*(self._fetch_section(year, gp, section) for section in sections))
+        if any(part is None for part in parts):
+            return None
+        return dict(zip(sections, parts))
+    
+    def create_performance_comparison_chart(self, data, team1, team2, save_path='performance_comparison.png',
+                                            final=False):
+        """
+        创建综合性能对比图表
         
-        # 1. 圈速对比
-        lap_data = data['lap_times']
-        categories = ['最快圈速', '平均圈速', '一致性']
-        team1_values = [
-            lap_data[team1]['fastest_lap'],
-            lap_data[team1]['average_lap'],
-            lap_data[team1]['consistency']
-        ]
-        team2_values = [
-            lap_data[team2]['fastest_lap'],
-            lap_data[team2]['average_lap'],
-            lap_data[team2]['consistency']
+        final=True 时以300 dpi输出最终图片，否则以120 dpi快速预览。
+        """
+        fig, (ax1, ax2, ax3, ax4) = self._get_figure(
+            'performance', (16, 12), 2, 2, [None, None, None, 'polar']
+        )
+        c1 = self.team_colors.get(team1, '#FF0000')
+        c2 = self.team_colors.get(team2, '#00FF00')
+        
+        # 各项数据只按车队取一次
+        t1l, t2l = data['lap_times'][team1], data['lap_times'][team2]
+        t1s, t2s = data['sector_times'][team1], data['sector_times'][team2]
+        t1t, t2t = data['telemetry_summary'][team1], data['telemetry_summary'][team2]
+        
+        # 1-3. 圈速、扇区时间、速度三组柱状图，由同一份规格表驱动
+        team1_values = [t1l['fastest_lap'], t1l['average_lap'], t1l['consistency']]
+        team2_values = [t2l['fastest_lap'], t2l['average_lap'], t2l['consistency']]
+        team1_sectors = [t1s['sector1'], t1s['sector2'], t1s['sector3']]
+        team2_sectors = [t2s['sector1'], t2s['sector2'], t2s['sector3']]
+        team1_speeds = [t1t['max_speed'], t1t['avg_speed']]
+        team2_speeds = [t2t['max_speed'], t2t['avg_speed']]
+        
+        specs = [
+            (ax1, ['最快圈速', '平均圈速', '一致性'], team1_values, team2_values, '%.3f',
+             '性能指标', '时间 (秒) / 一致性评分', '圈速性能对比'),
+            (ax2, ['第一扇区', '第二扇区', '第三扇区'], team1_sectors, team2_sectors, '%.3f',
+             '扇区', '时间 (秒)', '扇区时间对比'),
+            (ax3, ['最高速度', '平均速度'], team1_speeds, team2_speeds, '%.1f',
+             '速度指标', '速度 (km/h)', '速度性能对比'),
         ]
-        
-        x = np.arange(len(categories))
-        width = 0.35
-        
-        bars1 = ax1.bar(x - width/2, team1_values, width, label=team1, 
-                       color=self.team_colors.get(team1, '#FF0000'), alpha=0.8)
-        bars2 = ax1.bar(x + width/2, team2_values, width, label=team2, 
-                       color=self.team_colors.get(team2, '#00FF00'), alpha=0.8)
-        
-        ax1.set_xlabel('性能指标')
-        ax1.set_ylabel('时间 (秒) / 一致性评分')
-        ax1.set_title('圈速性能对比')
-        ax1.set_xticks(x)
-        ax1.set_xticklabels(categories)
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
-        
-        # 添加数值标签
-        for bars in [bars1, bars2]:
-            for bar in bars:
-                height = bar.get_height()
-                ax1.text(bar.get_x() + bar.get_width()/2., height + 0.01,
-                        f'{height:.3f}', ha='center', va='bottom', fontsize=9)
-        
-        # 2. 扇区时间对比
-        sector_data = data['sector_times']
-        sectors = ['第一扇区', '第二扇区', '第三扇区']
-        team1_sectors = [sector_data[team1]['sector1'], 
-                        sector_data[team1]['sector2'], 
-                        sector_data[team1]['sector3']]
-        team2_sectors = [sector_data[team2]['sector1'], 
-                        sector_data[team2]['sector2'], 
-                        sector_data[team2]['sector3']]
-        
-        x = np.arange(len(sectors))
-        bars1 = ax2.bar(x - width/2, team1_sectors, width, label=team1, 
-                       color=self.team_colors.get(team1, '#FF0000'), alpha=0.8)
-        bars2 = ax2.bar(x + width/2, team2_sectors, width, label=team2, 
-                       color=self.team_colors.get(team2, '#00FF00'), alpha=0.8)
-        
-        ax2.set_xlabel('扇区')
-        ax2.set_ylabel('时间 (秒)')
-        ax2.set_title('扇区时间对比')
-        ax2.set_xticks(x)
-        ax2.set_xticklabels(sectors)
-        ax2.legend()
-        ax2.grid(True, alpha=0.3)
-        
-        # 添加数值标签
-        for bars in [bars1, bars2]:
-            for bar in bars:
-                height = bar.get_height()
-                ax2.text(bar.get_x() + bar.get_width()/2., height + 0.01,
-                        f'{height:.3f}', ha='center', va='bottom', fontsize=9)
-        
-        # 3. 速度性能对比
-        telemetry_data = data['telemetry_summary']
-        speed_categories = ['最高速度', '平均速度']
-        team1_speeds = [telemetry_data[team1]['max_speed'], 
-                       telemetry_data[team1]['avg_speed']]
-        team2_speeds = [telemetry_data[team2]['max_speed'], 
-                       telemetry_data[team2]['avg_speed']]
-        
-        x = np.arange(len(speed_categories))
-        bars1 = ax3.bar(x - width/2, team1_speeds, width, label=team1, 
-                       color=self.team_colors.get(team1, '#FF0000'), alpha=0.8)
-        bars2 = ax3.bar(x + width/2, team2_speeds, width, label=team2, 
-                       color=self.team_colors.get(team2, '#00FF00'), alpha=0.8)
-        
-        ax3.set_xlabel('速度指标')
-        ax3.set_ylabel('速度 (km/h)')
-        ax3.set_title('速度性能对比')
-        ax3.set_xticks(x)
-        ax3.set_xticklabels(speed_categories)
-        ax3.legend()
-        ax3.grid(True, alpha=0.3)
-        
-        # 添加数值标签
-        for bars in [bars1, bars2]:
-            for bar in bars:
-                height = bar.get_height()
-                ax3.text(bar.get_x() + bar.get_width()/2., height + 1,
-                        f'{height:.1f}', ha='center', va='bottom', fontsize=9)
+        for ax, cats, v1, v2, fmt, xlabel, ylabel, title in specs:
+            self._grouped_bar(ax, cats, v1, v2, team1, team2, c1, c2, fmt, xlabel, ylabel, title)
         
         # 4. 综合性能雷达图
         categories_radar = ['圈速', '扇区1', '扇区2', '扇区3', '最高速度', '刹车效率']
         
         # 标准化数据 (0-1范围，1表示最好)
-        team1_radar = [
-            1 - (team1_values[0] - min(team1_values[0], team2_values[0])) / 
-                max(abs(team1_values[0] - team2_values[0]), 0.001),
-            1 - (team1_sectors[0] - min(team1_sectors[0], team2_sectors[0])) / 
-                max(abs(team1_sectors[0] - team2_sectors[0]), 0.001),
-            1 - (team1_sectors[1] - min(team1_sectors[1], team2_sectors[1])) / 
-                max(abs(team1_sectors[1] - team2_sectors[1]), 0.001),
-            1 - (team1_sectors[2] - min(team1_sectors[2], team2_sectors[2])) / 
-                max(abs(team1_sectors[2] - team2_sectors[2]), 0.001),
-            (team1_speeds[0] - min(team1_speeds[0], team2_speeds[0])) / 
-                max(abs(team1_speeds[0] - team2_speeds[0]), 0.001),
-            (telemetry_data[team1]['braking_efficiency'] - 
-             min(telemetry_data[team1]['braking_efficiency'], 
-                 telemetry_data[team2]['braking_efficiency'])) / 
-                max(abs(telemetry_data[team1]['braking_efficiency'] - 
-                       telemetry_data[team2]['braking_efficiency']), 0.001)
-        ]
-        
-        team2_radar = [
-            1 - (team2_values[0] - min(team1_values[0], team2_values[0])) / 
-                max(abs(team1_values[0] - team2_values[0]), 0.001),
-            1 - (team2_sectors[0] - min(team1_sectors[0], team2_sectors[0])) / 
-                max(abs(team1_sectors[0] - team2_sectors[0]), 0.001),
-            1 - (team2_sectors[1] - min(team1_sectors[1], team2_sectors[1])) / 
-                max(abs(team1_sectors[1] - team2_sectors[1]), 0.001),
-            1 - (team2_sectors[2] - min(team1_sectors[2], team2_sectors[2])) / 
-                max(abs(team1_sectors[2] - team2_sectors[2]), 0.001),
-            (team2_speeds[0] - min(team1_speeds[0], team2_speeds[0])) / 
-                max(abs(team1_speeds[0] - team2_speeds[0]), 0.001),
-            (telemetry_data[team2]['braking_efficiency'] - 
-             min(telemetry_data[team1]['braking_efficiency'], 
-                 telemetry_data[team2]['braking_efficiency'])) / 
-                max(abs(telemetry_data[team1]['braking_efficiency'] - 
-                       telemetry_data[team2]['braking_efficiency']), 0.001)
-        ]
-        
-        angles = np.linspace(0, 2 * np.pi, len(categories_radar), endpoint=False).tolist()
+        # 两队指标堆成 (2, 6) 数组一次性标准化；时间类指标越小越好，取反
+        V = np.array([
+            [team1_values[0], *team1_sectors, team1_speeds[0], t1t['braking_efficiency']],
+            [team2_values[0], *team2_sectors, team2_speeds[0], t2t['braking_efficiency']]
+        ])
+        lo, hi = V.min(0), V.max(0)
+        norm = (V - lo) / np.maximum(hi - lo, 0.001)
+        sign = np.array([-1, -1, -1, -1, 1, 1])
+        radar = np.where(sign > 0, norm, 1 - norm)
+        team1_radar, team2_radar = radar[0].tolist(), radar[1].tolist()
+        
+        angles = self._radar_angles
         team1_radar += team1_radar[:1]
         team2_radar += team2_radar[:1]
-        angles += angles[:1]
         
-        ax4 = plt.subplot(2, 2, 4, projection='polar')
         ax4.plot(angles, team1_radar, 'o-', linewidth=2, 
-                label=team1, color=self.team_colors.get(team1, '#FF0000'))
+                label=team1, color=c1)
         ax4.fill(angles, team1_radar, alpha=0.25, 
-                color=self.team_colors.get(team1, '#FF0000'))
+                color=c1)
         ax4.plot(angles, team2_radar, 'o-', linewidth=2, 
-                label=team2, color=self.team_colors.get(team2, '#00FF00'))
+                label=team2, color=c2)
         ax4.fill(angles, team2_radar, alpha=0.25, 
-                color=self.team_colors.get(team2, '#00FF00'))
+                color=c2)
         
         ax4.set_xticks(angles[:-1])
         ax4.set_xticklabels(categories_radar)
@@ -293,28 +380,39 @@ class MCPPerformanceAnalyzer:
         ax4.set_title('综合性能雷达图\n(外圈表示更好的性能)', pad=20)
         ax4.legend(loc='upper right', bbox_to_anchor=(1.3, 1.0))
         
-        plt.tight_layout()
-        plt.suptitle(f'2024 奥地利大奖赛 - {team1} vs {team2} 性能对比分析', 
+        fig.tight_layout()
+        fig.suptitle(f'2024 奥地利大奖赛 - {team1} vs {team2} 性能对比分析', 
                     fontsize=16, fontweight='bold', y=0.98)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight', facecolor='#0E1117')
-        plt.show()
+        self._save_figure('performance', fig, save_path, 300 if final else 120)
+        if self.interactive:
+            plt.show()
     
-    def create_lap_time_evolution_chart(self, data, team1, team2):
+    def create_lap_time_evolution_chart(self, data, team1, team2, final=False, backend='mpl'):
         """
         创建圈速进化图表
-        """
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-        fig.patch.set_facecolor('#0E1117')
-        
-        # 圈速进化
-        lap_data = data['lap_times']
-        laps = range(1, len(lap_data[team1]['lap_times']) + 1)
         
-        ax1.plot(laps, lap_data[team1]['lap_times'], 'o-', 
-                color=self.team_colors.get(team1, '#FF0000'), 
+        final=True 时以300 dpi输出最终图片，否则以120 dpi快速预览。
+        backend='plotly' 时改用Plotly绘制，适合多场比赛、圈数很多的数据。
+        """
+        if backend == 'plotly':
+            return self._create_lap_time_evolution_plotly(data, team1, team2, final)
+        if backend != 'mpl':
+            raise ValueError(f"Unsupported backend: {backend}")
+        
+        fig, (ax1, ax2) = self._get_figure('lap_evolution', (16, 6), 1, 2, [None, None])
+        c1 = self.team_colors.get(team1, '#FF0000')
+        c2 = self.team_colors.get(team2, '#00FF00')
+        
+        # 圈速进化，float32 对约90秒的圈速仍有毫秒级精度
+        t1 = np.asarray(data['lap_times'][team1]['lap_times'], dtype=np.float32)
+        t2 = np.asarray(data['lap_times'][team2]['lap_times'], dtype=np.float32)
+        laps = range(1, len(t1) + 1)
+        
+        ax1.plot(laps, t1, 'o-', 
+                color=c1, 
                 label=team1, linewidth=2, markersize=6)
-        ax1.plot(laps, lap_data[team2]['lap_times'], 'o-', 
-                color=self.team_colors.get(team2, '#00FF00'), 
+        ax1.plot(laps, t2, 'o-', 
+                color=c2, 
                 label=team2, linewidth=2, markersize=6)
         
         ax1.set_xlabel('圈数')
@@ -324,71 +422,128 @@ class MCPPerformanceAnalyzer:
         ax1.grid(True, alpha=0.3)
         
         # 圈速差异
-        time_diff = [t2 - t1 for t1, t2 in zip(lap_data[team1]['lap_times'], 
-                                              lap_data[team2]['lap_times'])]
-        colors = ['green' if diff < 0 else 'red' for diff in time_diff]
+        n = min(len(t1), len(t2))
+        time_diff = _lap_time_diff(t1[:n], t2[:n])
+        colors = np.where(time_diff < 0, 'green', 'red')
         
-        bars = ax2.bar(laps, time_diff, color=colors, alpha=0.7)
+        bars = ax2.bar(laps[:n], time_diff, color=colors, alpha=0.7)
         ax2.set_xlabel('圈数')
         ax2.set_ylabel(f'圈速差异 (秒)\n负值表示{team1}更快')
         ax2.set_title('逐圈圈速差异')
         ax2.axhline(y=0, color='white', linestyle='--', alpha=0.5)
         ax2.grid(True, alpha=0.3)
         
-        # 添加数值标签
-        for bar, diff in zip(bars, time_diff):
-            height = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width()/2., 
-                    height + (0.01 if height > 0 else -0.01),
-                    f'{diff:+.3f}', ha='center', 
-                    va='bottom' if height > 0 else 'top', fontsize=9)
+        # 添加数值标签，由 bar_label 根据柱子方向放在柱端外侧
+        ax2.bar_label(bars, labels=[f'{diff:+.3f}' for diff in time_diff], padding=3, fontsize=9)
         
-        plt.tight_layout()
-        plt.suptitle(f'2024 奥地利大奖赛 - {team1} vs {team2} 圈速分析', 
+        fig.tight_layout()
+        fig.suptitle(f'2024 奥地利大奖赛 - {team1} vs {team2} 圈速分析', 
                     fontsize=14, fontweight='bold', y=0.98)
-        plt.savefig('lap_time_evolution.png', dpi=300, bbox_inches='tight', facecolor='#0E1117')
-        plt.show()
+        self._save_figure('lap_evolution', fig, 'lap_time_evolution.png', 300 if final else 120)
+        if self.interactive:
+            plt.show()
+    
+    def _create_lap_time_evolution_plotly(self, data, team1, team2, final=False):
+        """
+        使用Plotly创建圈速进化图表，由kaleido无头渲染导出PNG
+        
+        数据点超过 PLOTLY_RESAMPLE_MIN_POINTS 时用 plotly-resampler 包装图表，
+        只把当前视图需要的点交给渲染器。
+        """
+        try:
+            import plotly.graph_objects as go
+            from plotly.subplots import make_subplots
+        except ImportError as e:
+            raise ImportError(f"Plotly backend requires plotly and kaleido: {e}")
+        
+        c1 = self.team_colors.get(team1, '#FF0000')
+        c2 = self.team_colors.get(team2, '#00FF00')
+        
+        t1 = np.asarray(data['lap_times'][team1]['lap_times'], dtype=np.float32)
+        t2 = np.asarray(data['lap_times'][team2]['lap_times'], dtype=np.float32)
+        n = min(len(t1), len(t2))
+        time_diff = _lap_time_diff(t1[:n], t2[:n])
+        
+        fig = make_subplots(rows=1, cols=2, subplot_titles=('圈速进化趋势', '逐圈圈速差异'))
+        if len(t1) + len(t2) > PLOTLY_RESAMPLE_MIN_POINTS:
+            try:
+                from plotly_resampler import FigureResampler
+            except ImportError as e:
+                raise ImportError(f"Plotly backend requires plotly-resampler for large datasets: {e}")
+            fig = FigureResampler(fig)
+        
+        # 圈速进化
+        fig.add_trace(go.Scatter(x=np.arange(1, len(t1) + 1), y=t1, mode='lines+markers',
+                                 name=team1, line=dict(color=c1, width=2)), row=1, col=1)
+        fig.add_trace(go.Scatter(x=np.arange(1, len(t2) + 1), y=t2, mode='lines+markers',
+                                 name=team2, line=dict(color=c2, width=2)), row=1, col=1)
+        
+        # 圈速差异，负值表示team1更快
+        fig.add_trace(go.Bar(x=np.arange(1, n + 1), y=time_diff,
+                             marker_color=np.where(time_diff < 0, 'green', 'red').tolist(),
+                             texttemplate='%{y:+.3f}', textposition='outside',
+                             opacity=0.7, showlegend=False), row=1, col=2)
+        fig.add_hline(y=0, line_dash='dash', line_color='white', opacity=0.5, row=1, col=2)
+        
+        fig.update_xaxes(title_text='圈数')
+        fig.update_yaxes(title_text='圈速 (秒)', row=1, col=1)
+        fig.update_yaxes(title_text=f'圈速差异 (秒)<br>负值表示{team1}更快', row=1, col=2)
+        fig.update_layout(
+            title=dict(text=f'2024 奥地利大奖赛 - {team1} vs {team2} 圈速分析', x=0.5),
+            template='plotly_dark', paper_bgcolor='#0E1117', plot_bgcolor='#0E1117',
+            width=1600, height=600
+        )
+        
+        fig.write_image('lap_time_evolution.png', engine='kaleido', scale=2 if final else 1)
+        if self.interactive:
+            fig.show()
+        return fig
     
     def print_performance_summary(self, data, team1, team2):
         """
         打印性能总结
-        """
-        print(f"\n🏁 {team1} vs {team2} 性能对比总结")
-        print("=" * 60)
         
+        所有行先收集到列表中，最后一次性输出。
+        """
         lap_data = data['lap_times']
         sector_data = data['sector_times']
         telemetry_data = data['telemetry_summary']
         
-        print(f"\n📊 圈速性能:")
-        print(f"{team1}: 最快 {lap_data[team1]['fastest_lap']:.3f}s, 平均 {lap_data[team1]['average_lap']:.3f}s")
-        print(f"{team2}: 最快 {lap_data[team2]['fastest_lap']:.3f}s, 平均 {lap_data[team2]['average_lap']:.3f}s")
-        
         fastest_diff = lap_data[team1]['fastest_lap'] - lap_data[team2]['fastest_lap']
         avg_diff = lap_data[team1]['average_lap'] - lap_data[team2]['average_lap']
         
-        print(f"\n🎯 性能差距:")
-        print(f"最快圈速差距: {fastest_diff:+.3f}s ({'优势' if fastest_diff < 0 else '劣势'}: {team1})")
-        print(f"平均圈速差距: {avg_diff:+.3f}s ({'优势' if avg_diff < 0 else '劣势'}: {team1})")
+        lines = [
+            f"\n🏁 {team1} vs {team2} 性能对比总结",
+            "=" * 60,
+            "\n📊 圈速性能:",
+            f"{team1}: 最快 {lap_data[team1]['fastest_lap']:.3f}s, 平均 {lap_data[team1]['average_lap']:.3f}s",
+            f"{team2}: 最快 {lap_data[team2]['fastest_lap']:.3f}s, 平均 {lap_data[team2]['average_lap']:.3f}s",
+            "\n🎯 性能差距:",
+            f"最快圈速差距: {fastest_diff:+.3f}s ({'优势' if fastest_diff < 0 else '劣势'}: {team1})",
+            f"平均圈速差距: {avg_diff:+.3f}s ({'优势' if avg_diff < 0 else '劣势'}: {team1})",
+            "\n🏎️ 扇区分析:"
+        ]
         
-        print(f"\n🏎️ 扇区分析:")
         for i, sector in enumerate(['第一扇区', '第二扇区', '第三扇区'], 1):
             t1_time = sector_data[team1][f'sector{i}']
             t2_time = sector_data[team2][f'sector{i}']
             diff = t1_time - t2_time
             winner = team1 if diff < 0 else team2
-            print(f"{sector}: {t1_time:.3f}s vs {t2_time:.3f}s (优势: {winner}, 差距: {abs(diff):.3f}s)")
-        
-        print(f"\n🚀 速度性能:")
-        print(f"最高速度: {telemetry_data[team1]['max_speed']:.1f} km/h vs {telemetry_data[team2]['max_speed']:.1f} km/h")
-        print(f"平均速度: {telemetry_data[team1]['avg_speed']:.1f} km/h vs {telemetry_data[team2]['avg_speed']:.1f} km/h")
+            lines.append(f"{sector}: {t1_time:.3f}s vs {t2_time:.3f}s (优势: {winner}, 差距: {abs(diff):.3f}s)")
+        
+        lines += [
+            "\n🚀 速度性能:",
+            f"最高速度: {telemetry_data[team1]['max_speed']:.1f} km/h vs {telemetry_data[team2]['max_speed']:.1f} km/h",
+            f"平均速度: {telemetry_data[team1]['avg_speed']:.1f} km/h vs {telemetry_data[team2]['avg_speed']:.1f} km/h",
+            "\n🔧 技术指标:",
+            f"刹车效率: {telemetry_data[team1]['braking_efficiency']:.3f} vs {telemetry_data[team2]['braking_efficiency']:.3f}",
+            f"一致性评分: {lap_data[team1]['consistency']:.3f} vs {lap_data[team2]['consistency']:.3f}"
+        ]
         
-        print(f"\n🔧 技术指标:")
-        print(f"刹车效率: {telemetry_data[team1]['braking_efficiency']:.3f} vs {telemetry_data[team2]['braking_efficiency']:.3f}")
-        print(f"一致性评分: {lap_data[team1]['consistency']:.3f} vs {lap_data[team2]['consistency']:.3f}")
+        print("\n".join(lines))
 
-def main():
-    """主函数"""
+async def run_analysis():
+    """异步执行分析：并发获取数据，并在线程池中同时渲染两张图表"""
     print("🏎️ F1赛车性能对比分析 - 红牛 vs 迈凯轮")
     print("基于MCP服务器数据的性能分析")
     print("=" * 60)
@@ -403,21 +558,29 @@ def main():
     team2 = 'McLaren'
     
     print(f"\n📡 正在获取 {year} 年{gp}大奖赛数据...")
-    data = analyzer.simulate_mcp_data(year, gp)
+    data = await analyzer.fetch_mcp_data(year, gp)
     
     if data:
         print("✅ 数据获取成功！")
         
-        # 生成性能对比图表
+        # 两张图表互不依赖，批处理模式下在线程池中并发生成；
+        # 交互模式经由pyplot的GUI后端绘图和显示，只能在主线程中依次生成
         print(f"\n📊 正在生成 {team1} vs {team2} 性能对比图表...")
-        analyzer.create_performance_comparison_chart(data, team1, team2)
-        
-        # 生成圈速进化图表
         print("\n📈 正在生成圈速进化分析...")
-        analyzer.create_lap_time_evolution_chart(data, team1, team2)
+        charts = [
+            functools.partial(analyzer.create_performance_comparison_chart, data, team1, team2, final=True),
+            functools.partial(analyzer.create_lap_time_evolution_chart, data, team1, team2, final=True)
+        ]
+        if analyzer.interactive:
+            for chart in charts:
+                chart()
+        else:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(None, chart) for chart in charts))
         
         # 打印性能总结
         analyzer.print_performance_summary(data, team1, team2)
+        analyzer.close()
         
         print("\n✅ 性能对比分析完成！")
         print("\n📁 生成的文件:")
@@ -432,5 +595,9 @@ def main():
     else:
         print("❌ 数据获取失败")
 
+def main():
+    """主函数"""
+    asyncio.run(run_analysis())
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,22 +5,53 @@
 获取2024年奥地利大奖赛真实数据进行红牛vs迈凯轮对比
 """
 
+import string
 import matplotlib.pyplot as plt
+from matplotlib.font_manager import FontProperties, findfont
 import numpy as np
-import pandas as pd
-from datetime import datetime
 
-# 设置中文字体和样式
-plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+# 设置中文字体和样式，背景色统一由rcParams提供，绘图时不再逐个设置
 plt.style.use('dark_background')
+plt.rcParams.update({
+    'font.sans-serif': ['Arial Unicode MS', 'SimHei', 'DejaVu Sans'],
+    'axes.unicode_minus': False,
+    'figure.facecolor': '#0E1117',
+    'savefig.facecolor': '#0E1117'
+})
+
+# 导入时解析一次字体回退链，之后的文字对象直接命中字体缓存
+findfont(FontProperties(family=plt.rcParams['font.sans-serif']))
 
 class RealMCPAnalyzer:
     """
     使用真实MCP服务器数据的F1性能分析器
     """
     
-    def __init__(self):
+    # 车队表现总结文本模板，类加载时构建一次，绘图时只做替换
+    _SUMMARY_TMPL = string.Template("""
+🏆 ${race_name} 车队表现总结
+
+${team1}:
+• 总积分: ${total_points_t1} 分
+• 最佳排名: P${best_position_t1}
+• 参赛车手: ${n_drivers_t1} 人
+• 车手: ${drivers_t1}
+
+${team2}:
+• 总积分: ${total_points_t2} 分  
+• 最佳排名: P${best_position_t2}
+• 参赛车手: ${n_drivers_t2} 人
+• 车手: ${drivers_t2}
+
+📊 对比结果:
+• 积分优势: ${points_leader}
+• 排名优势: ${position_leader}
+• 积分差距: ${points_gap} 分
+        """)
+    
+    def __init__(self, interactive=False):
+        # 交互模式下绘图后弹出窗口显示；批处理/CI模式只输出PNG并释放图表
+        self.interactive = interactive
         self.team_colors = {
             'Red Bull Racing': '#1E41FF',
             'Red Bull': '#1E41FF', 
@@ -43,30 +74,48 @@ class RealMCPAnalyzer:
             return None
             
         results = session_data['results']
-        team_performance = {}
         
-        for result in results:
-            team = result.get('TeamName', 'Unknown')
-            if team not in team_performance:
-                team_performance[team] = {
-                    'drivers': [],
-                    'positions': [],
-                    'points': [],
-                    'best_position': float('inf'),
-                    'total_points': 0
-                }
-            
-            team_performance[team]['drivers'].append(result.get('FullName', 'Unknown'))
-            team_performance[team]['positions'].append(result.get('Position', 999))
-            team_performance[team]['points'].append(result.get('Points', 0))
-            team_performance[team]['best_position'] = min(
-                team_performance[team]['best_position'], 
-                result.get('Position', 999)
-            )
-            team_performance[team]['total_points'] += result.get('Points', 0)
+        # 先按列拆成并行数组，再按车队做向量化归约
+        teams = np.array([r.get('TeamName', 'Unknown') for r in results])
+        names = np.array([r.get('FullName', 'Unknown') for r in results])
+        # 排名缺失（如未起跑）时为None或NaN，统一存为NaN；积分可能有半分（如12.5），缺失记0分
+        # float32能精确表示排名、NaN和半分积分，占用只有float64的一半
+        n = len(results)
+        pos = np.array([r.get('Position') for r in results], dtype=np.float32)
+        pts = np.nan_to_num(np.array([r.get('Points') for r in results], dtype=np.float32))
+        
+        if n == 0:
+            return {}
+        
+        # 一次排序完成分组：按车队编号稳定排序，同队车手保持原有顺序，各队数据连续存放
+        uniq, first, inv = np.unique(teams, return_index=True, return_inverse=True)
+        order = np.argsort(inv, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(np.bincount(inv))[:-1]))
+        names, pos, pts = names[order], pos[order], pts[order]
+        best = np.fmin.reduceat(pos, starts)  # fmin忽略NaN，全队都没有排名时结果为NaN
+        total = np.add.reduceat(pts, starts)
+        ends = np.append(starts[1:], n)
+        
+        team_performance = {}
+        for g in np.argsort(first):  # 保持车队首次出现的顺序
+            sl = slice(starts[g], ends[g])
+            team_performance[str(uniq[g])] = {
+                'drivers': names[sl].tolist(),
+                'positions': pos[sl],
+                'points': pts[sl],
+                'best_position': 999 if np.isnan(best[g]) else int(best[g]),  # 999表示无有效排名
+                'total_points': float(total[g])
+            }
         
         return team_performance
     
+    @staticmethod
+    def _format_position(pos):
+        """
+        格式化单个车手的排名，缺失的排名（NaN）显示为 P-
+        """
+        return 'P-' if np.isnan(pos) else f'P{int(pos)}'
+    
     def create_team_comparison_chart(self, team_data, team1, team2, race_name="奥地利大奖赛"):
         """
         创建车队对比图表
@@ -76,12 +125,13 @@ class RealMCPAnalyzer:
             return
             
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
-        fig.patch.set_facecolor('#0E1117')
         
         # 1. 车队积分对比
         teams = [team1, team2]
         points = [team_data[team1]['total_points'], team_data[team2]['total_points']]
-        colors = [self.team_colors.get(team1, '#FF0000'), self.team_colors.get(team2, '#00FF00')]
+        c1 = self.team_colors.get(team1, '#FF0000')
+        c2 = self.team_colors.get(team2, '#00FF00')
+        colors = [c1, c2]
         
         bars1 = ax1.bar(teams, points, color=colors, alpha=0.8)
         ax1.set_ylabel('积分')
@@ -89,10 +139,8 @@ class RealMCPAnalyzer:
         ax1.grid(True, alpha=0.3)
         
         # 添加数值标签
-        for bar, point in zip(bars1, points):
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                    f'{point}', ha='center', va='bottom', fontsize=12, fontweight='bold')
+        ax1.bar_label(bars1, labels=[f'{point:g}' for point in points], padding=3,
+                      fontsize=12, fontweight='bold')
         
         # 2. 最佳排名对比
         best_positions = [team_data[team1]['best_position'], team_data[team2]['best_position']]
@@ -104,39 +152,29 @@ class RealMCPAnalyzer:
         ax2.grid(True, alpha=0.3)
         
         # 添加数值标签
-        for bar, pos in zip(bars2, best_positions):
-            height = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width()/2., height - 0.1,
-                    f'P{pos}', ha='center', va='top', fontsize=12, fontweight='bold')
+        ax2.bar_label(bars2, labels=[f'P{pos}' for pos in best_positions], padding=3,
+                      fontsize=12, fontweight='bold')
         
         # 3. 车手排名分布
-        team1_positions = team_data[team1]['positions']
-        team2_positions = team_data[team2]['positions']
-        
-        x1 = [f"{team1}\n车手{i+1}" for i in range(len(team1_positions))]
-        x2 = [f"{team2}\n车手{i+1}" for i in range(len(team2_positions))]
-        
-        x_pos = np.arange(max(len(team1_positions), len(team2_positions)))
+        n_drivers = max(len(team_data[team1]['positions']), len(team_data[team2]['positions']))
+        x_pos = np.arange(n_drivers)
         width = 0.35
         
-        # 填充较短的列表
-        if len(team1_positions) < len(team2_positions):
-            team1_positions.extend([None] * (len(team2_positions) - len(team1_positions)))
-            x1.extend([f"{team1}\n车手{i+1}" for i in range(len(team1_positions), len(team2_positions))])
-        elif len(team2_positions) < len(team1_positions):
-            team2_positions.extend([None] * (len(team1_positions) - len(team2_positions)))
-            x2.extend([f"{team2}\n车手{i+1}" for i in range(len(team2_positions), len(team1_positions))])
+        # 较短的一队用NaN填充到相同长度，再用一次掩码取出有数据的柱子
+        team1_positions = np.full(n_drivers, np.nan)
+        team1_positions[:len(team_data[team1]['positions'])] = team_data[team1]['positions']
+        team2_positions = np.full(n_drivers, np.nan)
+        team2_positions[:len(team_data[team2]['positions'])] = team_data[team2]['positions']
         
-        # 只绘制有数据的柱子
-        team1_valid = [pos for pos in team1_positions if pos is not None]
-        team2_valid = [pos for pos in team2_positions if pos is not None]
+        team1_valid = team1_positions[~np.isnan(team1_positions)].astype(int)
+        team2_valid = team2_positions[~np.isnan(team2_positions)].astype(int)
         
-        if team1_valid:
+        if team1_valid.size:
             bars3_1 = ax3.bar(x_pos[:len(team1_valid)] - width/2, team1_valid, width, 
-                             label=team1, color=self.team_colors.get(team1, '#FF0000'), alpha=0.8)
-        if team2_valid:
+                             label=team1, color=c1, alpha=0.8)
+        if team2_valid.size:
             bars3_2 = ax3.bar(x_pos[:len(team2_valid)] + width/2, team2_valid, width, 
-                             label=team2, color=self.team_colors.get(team2, '#00FF00'), alpha=0.8)
+                             label=team2, color=c2, alpha=0.8)
         
         ax3.set_ylabel('完赛排名')
         ax3.set_title('车手排名对比')
@@ -147,41 +185,32 @@ class RealMCPAnalyzer:
         ax3.grid(True, alpha=0.3)
         
         # 添加数值标签
-        if team1_valid:
-            for i, (bar, pos) in enumerate(zip(bars3_1, team1_valid)):
-                height = bar.get_height()
-                ax3.text(bar.get_x() + bar.get_width()/2., height - 0.1,
-                        f'P{pos}', ha='center', va='top', fontsize=10)
-        if team2_valid:
-            for i, (bar, pos) in enumerate(zip(bars3_2, team2_valid)):
-                height = bar.get_height()
-                ax3.text(bar.get_x() + bar.get_width()/2., height - 0.1,
-                        f'P{pos}', ha='center', va='top', fontsize=10)
+        if team1_valid.size:
+            ax3.bar_label(bars3_1, labels=[f'P{pos}' for pos in team1_valid], padding=3, fontsize=10)
+        if team2_valid.size:
+            ax3.bar_label(bars3_2, labels=[f'P{pos}' for pos in team2_valid], padding=3, fontsize=10)
         
         # 4. 车队表现总结
         ax4.axis('off')
         
         # 创建表现总结文本
-        summary_text = f"""
-🏆 {race_name} 车队表现总结
-
-{team1}:
-• 总积分: {team_data[team1]['total_points']} 分
-• 最佳排名: P{team_data[team1]['best_position']}
-• 参赛车手: {len(team_data[team1]['drivers'])} 人
-• 车手: {', '.join(team_data[team1]['drivers'])}
-
-{team2}:
-• 总积分: {team_data[team2]['total_points']} 分  
-• 最佳排名: P{team_data[team2]['best_position']}
-• 参赛车手: {len(team_data[team2]['drivers'])} 人
-• 车手: {', '.join(team_data[team2]['drivers'])}
-
-📊 对比结果:
-• 积分优势: {team1 if team_data[team1]['total_points'] > team_data[team2]['total_points'] else team2}
-• 排名优势: {team1 if team_data[team1]['best_position'] < team_data[team2]['best_position'] else team2}
-• 积分差距: {abs(team_data[team1]['total_points'] - team_data[team2]['total_points'])} 分
-        """
+        t1, t2 = team_data[team1], team_data[team2]
+        summary_text = self._SUMMARY_TMPL.substitute(
+            race_name=race_name,
+            team1=team1,
+            total_points_t1=f"{t1['total_points']:g}",
+            best_position_t1=t1['best_position'],
+            n_drivers_t1=len(t1['drivers']),
+            drivers_t1=', '.join(t1['drivers']),
+            team2=team2,
+            total_points_t2=f"{t2['total_points']:g}",
+            best_position_t2=t2['best_position'],
+            n_drivers_t2=len(t2['drivers']),
+            drivers_t2=', '.join(t2['drivers']),
+            points_leader=team1 if t1['total_points'] > t2['total_points'] else team2,
+            position_leader=team1 if t1['best_position'] < t2['best_position'] else team2,
+            points_gap=f"{abs(t1['total_points'] - t2['total_points']):g}"
+        )
         
         ax4.text(0.05, 0.95, summary_text, transform=ax4.transAxes, 
                 fontsize=11, verticalalignment='top', fontfamily='monospace',
@@ -190,73 +219,78 @@ class RealMCPAnalyzer:
         plt.tight_layout()
         plt.suptitle(f'2024 {race_name} - {team1} vs {team2} 车队表现对比', 
                     fontsize=16, fontweight='bold', y=0.98)
-        plt.savefig(f'team_comparison_{race_name}.png', dpi=300, bbox_inches='tight', facecolor='#0E1117')
-        plt.show()
+        plt.savefig(f'team_comparison_{race_name}.png', dpi=300, bbox_inches='tight')
+        if self.interactive:
+            plt.show()
+        else:
+            plt.close(fig)
     
     def print_detailed_analysis(self, team_data, team1, team2, race_name="奥地利大奖赛"):
         """
         打印详细分析报告
+        
+        所有行先收集到列表中，最后一次性输出。
         """
-        print(f"\n🏁 2024 {race_name} - {team1} vs {team2} 详细分析")
-        print("=" * 80)
+        lines = [
+            f"\n🏁 2024 {race_name} - {team1} vs {team2} 详细分析",
+            "=" * 80
+        ]
         
         if team1 not in team_data or team2 not in team_data:
-            print(f"❌ 缺少 {team1} 或 {team2} 的数据")
+            lines.append(f"❌ 缺少 {team1} 或 {team2} 的数据")
+            print("\n".join(lines))
             return
         
-        # 车队总体表现
-        print(f"\n🏆 车队总体表现:")
-        print(f"{team1}:")
-        print(f"  • 总积分: {team_data[team1]['total_points']} 分")
-        print(f"  • 最佳排名: P{team_data[team1]['best_position']}")
-        print(f"  • 参赛车手数: {len(team_data[team1]['drivers'])}")
+        t1, t2 = team_data[team1], team_data[team2]
         
-        print(f"\n{team2}:")
-        print(f"  • 总积分: {team_data[team2]['total_points']} 分")
-        print(f"  • 最佳排名: P{team_data[team2]['best_position']}")
-        print(f"  • 参赛车手数: {len(team_data[team2]['drivers'])}")
+        # 车队总体表现
+        lines += [
+            "\n🏆 车队总体表现:",
+            f"{team1}:",
+            f"  • 总积分: {t1['total_points']:g} 分",
+            f"  • 最佳排名: P{t1['best_position']}",
+            f"  • 参赛车手数: {len(t1['drivers'])}",
+            f"\n{team2}:",
+            f"  • 总积分: {t2['total_points']:g} 分",
+            f"  • 最佳排名: P{t2['best_position']}",
+            f"  • 参赛车手数: {len(t2['drivers'])}"
+        ]
         
         # 对比分析
-        points_diff = team_data[team1]['total_points'] - team_data[team2]['total_points']
-        position_diff = team_data[team2]['best_position'] - team_data[team1]['best_position']
+        points_diff = t1['total_points'] - t2['total_points']
+        position_diff = t2['best_position'] - t1['best_position']
         
-        print(f"\n📊 对比分析:")
-        print(f"积分差距: {points_diff:+d} 分 ({'优势' if points_diff > 0 else '劣势'}: {team1})")
-        print(f"最佳排名差距: {position_diff:+d} 位 ({'优势' if position_diff > 0 else '劣势'}: {team1})")
+        lines += [
+            "\n📊 对比分析:",
+            f"积分差距: {points_diff:+g} 分 ({'优势' if points_diff > 0 else '劣势'}: {team1})",
+            f"最佳排名差距: {position_diff:+d} 位 ({'优势' if position_diff > 0 else '劣势'}: {team1})"
+        ]
         
         # 车手表现详情
-        print(f"\n👨‍🏎️ 车手表现详情:")
-        print(f"{team1}:")
-        for i, (driver, pos, points) in enumerate(zip(
-            team_data[team1]['drivers'], 
-            team_data[team1]['positions'], 
-            team_data[team1]['points']
-        )):
-            print(f"  {i+1}. {driver}: P{pos}, {points} 分")
-        
-        print(f"\n{team2}:")
-        for i, (driver, pos, points) in enumerate(zip(
-            team_data[team2]['drivers'], 
-            team_data[team2]['positions'], 
-            team_data[team2]['points']
-        )):
-            print(f"  {i+1}. {driver}: P{pos}, {points} 分")
+        lines += ["\n👨‍🏎️ 车手表现详情:", f"{team1}:"]
+        lines += [f"  {i+1}. {driver}: {self._format_position(pos)}, {points:g} 分"
+                  for i, (driver, pos, points) in enumerate(zip(t1['drivers'], t1['positions'], t1['points']))]
+        lines.append(f"\n{team2}:")
+        lines += [f"  {i+1}. {driver}: {self._format_position(pos)}, {points:g} 分"
+                  for i, (driver, pos, points) in enumerate(zip(t2['drivers'], t2['positions'], t2['points']))]
         
         # 战略建议
-        print(f"\n💡 分析总结:")
+        lines.append("\n💡 分析总结:")
         if points_diff > 0:
-            print(f"• {team1} 在本场比赛中表现更出色，获得了更多积分")
+            lines.append(f"• {team1} 在本场比赛中表现更出色，获得了更多积分")
         elif points_diff < 0:
-            print(f"• {team2} 在本场比赛中表现更出色，获得了更多积分")
+            lines.append(f"• {team2} 在本场比赛中表现更出色，获得了更多积分")
         else:
-            print(f"• 两队在积分上打成平手，竞争激烈")
+            lines.append("• 两队在积分上打成平手，竞争激烈")
         
         if position_diff > 0:
-            print(f"• {team1} 获得了更好的最佳完赛排名")
+            lines.append(f"• {team1} 获得了更好的最佳完赛排名")
         elif position_diff < 0:
-            print(f"• {team2} 获得了更好的最佳完赛排名")
+            lines.append(f"• {team2} 获得了更好的最佳完赛排名")
         else:
-            print(f"• 两队的最佳完赛排名相同")
+            lines.append("• 两队的最佳完赛排名相同")
+        
+        print("\n".join(lines))
 
 def main():
     """主函数 - 演示如何使用MCP服务器数据"""
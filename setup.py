@@ -1,57 +0,0 @@
-#!/usr/bin/env python3
-"""
-FastF1 MCP Server Setup Script
-"""
-
-from setuptools import setup, find_packages
-
-with open("README.md", "r", encoding="utf-8") as fh:
-    long_description = fh.read()
-
-with open("requirements.txt", "r", encoding="utf-8") as fh:
-    requirements = [line.strip() for line in fh if line.strip() and not line.startswith("#")]
-
-setup(
-    name="fastf1-mcp-server",
-    version="2.0.0",
-    author="FastF1 MCP Team",
-    author_email="contact@example.com",
-    description="A comprehensive MCP server for F1 data using FastF1 library",
-    long_description=long_description,
-    long_description_content_type="text/markdown",
-    url="https://github.com/yourusername/fastf1-mcp-server",
-    packages=find_packages(),
-    classifiers=[
-        "Development Status :: 4 - Beta",
-        "Intended Audience :: Developers",
-        "License :: OSI Approved :: MIT License",
-        "Operating System :: OS Independent",
-        "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
-        "Programming Language :: Python :: 3.10",
-        "Programming Language :: Python :: 3.11",
-        "Topic :: Communications",
-        "Topic :: Internet :: WWW/HTTP :: Dynamic Content",
-        "Topic :: Software Development :: Libraries :: Python Modules",
-        "Topic :: Sports",
-    ],
-    python_requires=">=3.8",
-    install_requires=requirements,
-    extras_require={
-        "dev": [
-            "pytest>=7.0.0",
-            "pytest-asyncio>=0.20.0",
-            "black>=22.0.0",
-            "flake8>=5.0.0",
-            "mypy>=0.990",
-        ],
-    },
-    entry_points={
-        "console_scripts": [
-            "fastf1-mcp-server=fastf1_mcp_server:main",
-        ],
-    },
-    include_package_data=True,
-    zip_safe=False,
-)
\ No newline at end of file